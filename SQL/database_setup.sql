@@ -41,6 +41,8 @@ CREATE TABLE IF NOT EXISTS public.item_images (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     item_id UUID REFERENCES public.items(id) ON DELETE CASCADE,
     image_url TEXT NOT NULL,
+    -- Widths of the WebP/JPEG thumbnails stored next to image_url; NULL when there are none
+    thumbnail_widths INTEGER[],
     sales_image_overlay_url TEXT,
     sales_image_extended_url TEXT,
     is_primary BOOLEAN DEFAULT false,
@@ -48,6 +50,15 @@ CREATE TABLE IF NOT EXISTS public.item_images (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW())
 );
 
+-- Indexes
+-- Keyset pagination of a user's items walks (created_at, id) newest first
+CREATE INDEX IF NOT EXISTS idx_items_user_created_id
+    ON public.items (user_id, created_at DESC, id DESC);
+
+-- Delta syncs read a user's items changed since the last sync watermark
+CREATE INDEX IF NOT EXISTS idx_items_user_updated
+    ON public.items (user_id, updated_at);
+
 -- Row Level Security
 -- Enable RLS on tables
 ALTER TABLE public.users ENABLE ROW LEVEL SECURITY;
@@ -151,6 +162,12 @@ BEGIN
         ALTER TABLE public.item_images ADD COLUMN sales_image_extended_url TEXT;
     END IF;
 
+    -- Add thumbnail widths column if it doesn't exist
+    IF NOT EXISTS (SELECT 1 FROM information_schema.columns 
+                  WHERE table_name = 'item_images' AND column_name = 'thumbnail_widths') THEN
+        ALTER TABLE public.item_images ADD COLUMN thumbnail_widths INTEGER[];
+    END IF;
+
     -- Add sale_status column if it doesn't exist
     IF NOT EXISTS (
         SELECT 1 
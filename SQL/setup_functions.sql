@@ -13,6 +13,50 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER; 
 
+-- Home page dashboard: status counts plus the most recent items, in one call.
+-- Counts are aggregated in the database and the recent items are read through the
+-- (user_id, created_at, id) index, so the response stays the same small size
+-- however many items the user has.
+CREATE OR REPLACE FUNCTION get_item_dashboard(p_user_id UUID, p_recent_limit INTEGER DEFAULT 5)
+RETURNS TABLE (
+    total BIGINT,
+    available BIGINT,
+    paid BIGINT,
+    claimed BIGINT,
+    complete BIGINT,
+    recent_items JSON
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        count(*),
+        count(*) FILTER (WHERE i.status = 'available'),
+        count(*) FILTER (WHERE i.status = 'paid_ready'),
+        count(*) FILTER (WHERE i.status = 'claimed'),
+        count(*) FILTER (WHERE i.status = 'complete'),
+        (
+            SELECT COALESCE(json_agg(recent), '[]'::json)
+            FROM (
+                SELECT r.id, r.name, r.status, r.price_usd, r.created_at,
+                    img.image_url, img.thumbnail_widths
+                FROM public.items r
+                LEFT JOIN LATERAL (
+                    SELECT im.image_url, im.thumbnail_widths
+                    FROM public.item_images im
+                    WHERE im.item_id = r.id
+                    ORDER BY im.is_primary DESC, im.created_at
+                    LIMIT 1
+                ) img ON true
+                WHERE r.user_id = p_user_id
+                ORDER BY r.created_at DESC, r.id DESC
+                LIMIT p_recent_limit
+            ) recent
+        )
+    FROM public.items i
+    WHERE i.user_id = p_user_id;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
 -- Create public_links table if it doesn't exist
 DO $$ 
 BEGIN
@@ -48,4 +92,54 @@ BEGIN
             BEFORE UPDATE ON public.public_links
             FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
     END IF;
-END $$; 
\ No newline at end of file
+END $$; 
+
+-- Public catalog for a link visitor: the active link, its owner's name and
+-- WhatsApp settings and the owner's unsold items with their primary image,
+-- all in one call. Returns no row when the code is unknown or inactive.
+-- The phone number is only returned when the owner shares it. The app calls
+-- this with the service role; it is not executable by anon or signed-in users.
+CREATE OR REPLACE FUNCTION get_public_catalog(p_link_code TEXT)
+RETURNS TABLE (
+    link JSON,
+    owner_first_name TEXT,
+    owner_last_name TEXT,
+    whatsapp_phone TEXT,
+    share_whatsapp_for_items BOOLEAN,
+    items JSON
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        row_to_json(pl),
+        u.first_name,
+        u.last_name,
+        CASE WHEN u.share_whatsapp_for_items THEN u.whatsapp_phone END,
+        u.share_whatsapp_for_items,
+        (
+            SELECT COALESCE(json_agg(catalog ORDER BY catalog.created_at DESC, catalog.id DESC), '[]'::json)
+            FROM (
+                SELECT i.id, i.name, i.description, i.category, i.condition,
+                    i.price_usd, i.price_local, i.created_at,
+                    img.image_url, img.thumbnail_widths
+                FROM public.items i
+                LEFT JOIN LATERAL (
+                    SELECT im.image_url, im.thumbnail_widths
+                    FROM public.item_images im
+                    WHERE im.item_id = i.id
+                    ORDER BY im.is_primary DESC, im.created_at
+                    LIMIT 1
+                ) img ON true
+                WHERE i.user_id = pl.user_id
+                AND i.is_sold = false
+            ) catalog
+        )
+    FROM public.public_links pl
+    LEFT JOIN public.users u ON u.id = pl.user_id
+    WHERE pl.link_code = p_link_code
+    AND pl.is_active = true
+    LIMIT 1;
+END;
+$$ LANGUAGE plpgsql STABLE SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION get_public_catalog(TEXT) FROM PUBLIC, anon, authenticated;
@@ -17,4 +17,19 @@ $$ LANGUAGE plpgsql SECURITY DEFINER;
 -- Trigger that runs the function after a new auth user is created
 CREATE OR REPLACE TRIGGER on_auth_user_created
   AFTER INSERT ON auth.users
-  FOR EACH ROW EXECUTE PROCEDURE public.handle_new_user(); 
\ No newline at end of file
+  FOR EACH ROW EXECUTE PROCEDURE public.handle_new_user();
+
+-- Touch the parent item when its images change, so delta syncs on
+-- items.updated_at also pick up new image and sales photo URLs
+CREATE OR REPLACE FUNCTION public.touch_item_from_image()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE public.items SET updated_at = NOW() WHERE id = NEW.item_id;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS touch_item_on_image_change ON public.item_images;
+CREATE TRIGGER touch_item_on_image_change
+  AFTER INSERT OR UPDATE ON public.item_images
+  FOR EACH ROW EXECUTE PROCEDURE public.touch_item_from_image();
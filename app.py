@@ -4,7 +4,6 @@ import os
 import sys
 from urllib.parse import urlparse
 import traceback
-from supabase import create_client
 from auth_state import init_auth_state, is_authenticated
 
 # Add the current directory to the Python path to help with module discovery
@@ -34,7 +33,8 @@ try:
     # Services
     from services.auth_service import get_current_user, handle_auth_state
     from services.auth_service import logout, restore_auth_from_cookies
-    from services.data_service import init_supabase, init_postgrest, load_items
+    from services.data_service import init_supabase, init_postgrest, get_service_client
+    from services.photo_jobs import start_photo_worker
     
     # UI components
     from components.ui_components import apply_custom_css, render_sidebar_nav, render_login_ui
@@ -65,10 +65,8 @@ def debug_auth_status():
     st.sidebar.markdown("---")
     st.sidebar.write("### Debug Information")
     
-    # Create a service role client for database operations
-    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    url = os.getenv('SUPABASE_URL')
-    service_client = create_client(url, service_key)
+    # Use the shared service role client
+    service_client = get_service_client()
     
     # Check if user exists in session
     user = get_current_user()
@@ -152,15 +150,14 @@ else:
         render_login_ui()
         st.stop()
     else:
-        # Create a service role client for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv('SUPABASE_URL')
-        service_client = create_client(url, service_key)
+        user = get_current_user()
+        
+        # Make sure queued sales photo jobs are being worked on
+        start_photo_worker()
         
         # Get user's first name from the database
         try:
-            user = get_current_user()
-            user_info = service_client.table('users')\
+            user_info = get_service_client().table('users')\
                 .select('first_name')\
                 .eq('id', user.id)\
                 .execute()
@@ -227,27 +224,16 @@ else:
         """, unsafe_allow_html=True)
         st.session_state.mobile_nav_hint_shown = True
 
-        # Load items (used by multiple pages)
-        try:
-            items = load_items()
-        except Exception as e:
-            if is_development:
-                st.error(f"Error loading items: {str(e)}")
-                import traceback
-                st.error(traceback.format_exc())
-            items = []
-            st.warning("Could not load your items. Please try refreshing the page.")
-
         # Main content with error handling for each page
         try:
             if st.session_state.current_page in ['all', 'available', 'paid_ready', 'claimed', 'complete', 'sold_to']:
-                render_items_page(st.session_state.current_page, items, first_name)
+                render_items_page(st.session_state.current_page, first_name)
             elif st.session_state.current_page == 'add':
                 render_add_item_form(rerun_callback=st.rerun)
             elif st.session_state.current_page == 'bulk_upload':
                 render_bulk_upload_form(rerun_callback=st.rerun)
             elif st.session_state.current_page == 'photos':
-                render_photos_page(items)
+                render_photos_page()
             elif st.session_state.current_page == 'public_links':
                 render_public_links_page()
             elif st.session_state.current_page == 'settings':
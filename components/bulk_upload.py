@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from PIL import Image
 import io
-from services.data_service import add_item
+from services.data_service import add_items_bulk
 from utils.translation_utils import t
 
 def render_bulk_upload_form(rerun_callback=None):
@@ -108,29 +108,23 @@ def render_bulk_upload_form(rerun_callback=None):
                 st.error("Please enter names for all items")
                 return
             
-            # Process each item
-            success_count = 0
-            for item in items_data:
-                # Create the item data
-                item_data = {
-                    "name": item['name'],
-                    "price_usd": int(item['price_usd']) if item['price_usd'] > 0 else None,
-                    "price_local": int(item['price_local']) if item['price_local'] > 0 else None,
-                    "user_id": st.session_state.user.id,
-                    "sale_status": 'available',
-                    "is_sold": False
-                }
-                
-                # Add the item
-                if add_item(item_data, item['image']):
-                    success_count += 1
+            # Create the item data for every item
+            rows = [{
+                "name": item['name'],
+                "price_usd": int(item['price_usd']) if item['price_usd'] > 0 else None,
+                "price_local": int(item['price_local']) if item['price_local'] > 0 else None,
+                "user_id": st.session_state.user.id,
+                "sale_status": 'available',
+                "is_sold": False
+            } for item in items_data]
+            
+            # Add all items in one batch
+            created = add_items_bulk(rows, [item['image'] for item in items_data])
+            success_count = len(created) if created else 0
             
             # Show success message
             st.success(f"Successfully added {success_count} out of {len(items_data)} items")
             
-            # Clear the cache to force reload of items
-            st.cache_data.clear()
-            
             # Switch to the available items view
             st.session_state.current_page = 'available'
             if rerun_callback:
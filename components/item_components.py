@@ -2,9 +2,40 @@ import streamlit as st
 import io
 from utils.translation_utils import t
 from services.data_service import update_item, add_item, is_development
-from utils.image_utils import generate_sales_photo
+from utils.image_utils import thumbnail_path
 from PIL import Image
 import traceback
+import html
+
+def render_item_image(item, caption=None, width=None, sizes="100vw"):
+    """
+    Show an item's image from its thumbnails, letting the browser pick the
+    smallest adequate width (WebP where supported, JPEG otherwise). width
+    fixes the display width in pixels; otherwise the image fills its column
+    and sizes tells the browser how wide that column is. Images uploaded
+    before thumbnails existed fall back to the original.
+    """
+    widths = item.get('thumbnail_widths')
+    if not widths:
+        st.image(item['image_url'], caption=caption, width=width)
+        return
+    
+    image_url = item['image_url']
+    if width:
+        sizes = f"{width}px"
+    webp_srcset = ', '.join(f"{thumbnail_path(image_url, w, 'webp')} {w}w" for w in widths)
+    jpeg_srcset = ', '.join(f"{thumbnail_path(image_url, w, 'jpg')} {w}w" for w in widths)
+    fallback = thumbnail_path(image_url, widths[-1], 'jpg')
+    style = f"width: {width}px;" if width else "width: 100%;"
+    st.markdown(
+        f'<picture>'
+        f'<source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}">'
+        f'<img src="{fallback}" srcset="{jpeg_srcset}" sizes="{sizes}" alt="{html.escape(item.get("name") or "")}" loading="lazy" style="{style} height: auto;">'
+        f'</picture>',
+        unsafe_allow_html=True
+    )
+    if caption:
+        st.caption(caption)
 
 def render_edit_modal(rerun_callback=None):
     """Render the edit item modal when triggered"""
@@ -88,8 +119,6 @@ def render_edit_modal(rerun_callback=None):
                             st.success(t('item_updated'))
                             st.session_state.show_edit_modal = False
                             st.session_state.editing_item = None
-                            # Clear the cache to force reload of items
-                            st.cache_data.clear()
                             if rerun_callback:
                                 rerun_callback()
             with col2:
@@ -102,21 +131,19 @@ def render_edit_modal(rerun_callback=None):
             st.markdown('</div>', unsafe_allow_html=True)
 
 def render_item_grid(items, enable_edit=True, rerun_callback=None):
-    """Render a grid of items"""
-    if not items:
-        st.info(t('no_items_found', status=st.session_state.current_page.replace('_', ' ')))
-        return
-        
-    # Create a grid layout for items
-    cols = st.columns(3)
+    """Render a grid of items; any iterable works and is drawn as it is consumed"""
+    cols = None
     for i, item in enumerate(items):
+        # Create the grid layout once the first item arrives
+        if cols is None:
+            cols = st.columns(3)
         with cols[i % 3]:
             # Display item number (first 8 chars of UUID)
             item_number = item['id'][:8]
             st.markdown(f'<div style="font-size: 0.8em; color: #666; margin-bottom: 0.5em;">#{item_number}</div>', unsafe_allow_html=True)
             
             if item.get('image_url'):
-                st.image(item['image_url'], caption=item['name'])
+                render_item_image(item, caption=item['name'], sizes="(max-width: 640px) 100vw, 33vw")
             else:
                 st.image("https://via.placeholder.com/200x200?text=No+Image", caption=item['name'])
             
@@ -157,6 +184,9 @@ def render_item_grid(items, enable_edit=True, rerun_callback=None):
                     if rerun_callback:
                         rerun_callback()
             st.markdown('</div>', unsafe_allow_html=True)
+    
+    if cols is None:
+        st.info(t('no_items_found', status=st.session_state.current_page.replace('_', ' ')))
 
 def render_add_item_form(rerun_callback=None):
     """Render the add item form"""
@@ -238,8 +268,6 @@ def render_add_item_form(rerun_callback=None):
                 new_item = add_item(item_data, image)
                 if new_item:
                     st.success(t('item_added'))
-                    # Clear the cache to force reload of items
-                    st.cache_data.clear()
                     # Switch to the available items view
                     st.session_state.current_page = 'available'
                     if rerun_callback:
@@ -248,19 +276,11 @@ def render_add_item_form(rerun_callback=None):
         st.markdown('</div>', unsafe_allow_html=True)
 
 def render_sold_to_view(items):
-    """Render items grouped by sold_to"""
+    """Render an ItemStore's items grouped by sold_to"""
     
-    # Group items by sold_to
-    sold_items = [item for item in items if item.get('sold_to')]
-    if sold_items:
-        # Group by sold_to
-        sold_to_groups = {}
-        for item in sold_items:
-            buyer = item.get('sold_to', 'Unknown')
-            if buyer not in sold_to_groups:
-                sold_to_groups[buyer] = []
-            sold_to_groups[buyer].append(item)
-        
+    # Group items by sold_to using the store's prebuilt index
+    sold_to_groups = items.by_sold_to()
+    if sold_to_groups:
         # Display each group
         for buyer, buyer_items in sold_to_groups.items():
             st.subheader(f"👤 {buyer}")
@@ -65,7 +65,8 @@ def signup(email: str, password: str, first_name: str, last_name: str):
         st.write("Attempting to sign up...")
         
         try:
-            # Create a service role client for auth operations
+            # Create a dedicated service role client for auth operations; sign_up
+            # stores session state on the client, so the shared one is not used here
             service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
             url = os.getenv('SUPABASE_URL')
             service_client = create_client(url, service_key)
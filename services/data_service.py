@@ -7,10 +7,15 @@ import uuid
 import time
 import random
 import string
-from utils.image_utils import generate_and_store_sales_photos
 import datetime
 from utils.translation_utils import t
 from auth_state import get_user_id
+from services.item_cache import get_cached_items, set_cached_items, update_cached_item, invalidate_cached_items
+from services.item_cache import get_sync_state, merge_cached_items, get_cached_store
+from services.item_store import ItemStore
+from services.upload_pipeline import upload_files
+from services.photo_jobs import enqueue_sales_photos
+from utils.image_utils import normalize_upload, make_thumbnails, thumbnail_path, THUMBNAIL_FORMATS
 
 # Set development mode flag
 is_development = os.getenv('ENVIRONMENT', '').lower() == 'development'
@@ -84,51 +89,354 @@ def init_postgrest():
     """
     pass
 
+# Shared service role client
+@st.cache_resource
+def get_service_client():
+    """
+    Return the process-wide service role client.
+    The client is created once and shared by every session and thread, so its
+    keep-alive connection pools are reused instead of being rebuilt on each rerun.
+    """
+    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+    url = os.getenv("SUPABASE_URL")
+    return create_client(url, service_key)
+
+# Columns each view renders, as (items columns, item_images columns)
+ITEM_PROJECTIONS = {
+    'grid': (
+        'id, name, price_usd, price_local, sale_status, is_sold, sold_to, created_at, updated_at',
+        'image_url, thumbnail_widths'
+    ),
+    'photos': (
+        'id, name, price_usd, price_local, is_sold, created_at, updated_at',
+        'image_url, sales_image_overlay_url, sales_image_extended_url'
+    ),
+}
+
+# Build the PostgREST select string for a projection profile
+def projection_select(profile):
+    columns, image_columns = ITEM_PROJECTIONS[profile]
+    return f"{columns}, item_images({image_columns})"
+
+# Field names an item carries once loaded with a projection profile
+def projection_fields(profile):
+    columns, image_columns = ITEM_PROJECTIONS[profile]
+    fields = [column.strip() for column in columns.split(',')] + ['image_url']
+    if 'thumbnail_widths' in image_columns:
+        fields.append('thumbnail_widths')
+    if 'sales_image_overlay_url' in image_columns:
+        fields += ['sales_overlay_url', 'sales_extended_url']
+    return fields
+
+# Flatten the embedded item_images rows onto each item
+def attach_image_urls(items, include_sales=True):
+    for item in items:
+        # Get the first image URL if available
+        image_url = None
+        thumbnail_widths = None
+        sales_overlay_url = None
+        sales_extended_url = None
+        item_images = item.pop('item_images', None)
+        if item_images:
+            image_url = item_images[0]['image_url']
+            thumbnail_widths = item_images[0].get('thumbnail_widths')
+            sales_overlay_url = item_images[0].get('sales_image_overlay_url')
+            sales_extended_url = item_images[0].get('sales_image_extended_url')
+        
+        # Add the URLs to the item
+        item['image_url'] = image_url
+        item['thumbnail_widths'] = thumbnail_widths
+        if include_sales:
+            item['sales_overlay_url'] = sales_overlay_url
+            item['sales_extended_url'] = sales_extended_url
+    return items
+
+# Number of items fetched per keyset page
+ITEM_PAGE_SIZE = 200
+
+# Largest inventory kept in the per-user item cache; bigger ones are streamed
+# from the database with their filters on every load instead
+ITEM_CACHE_MAX_ROWS = int(os.getenv('ITEM_CACHE_MAX_ROWS', '2000'))
+
+# Fetch a user's items from the database one keyset page at a time
+def iter_item_pages(user_id, profile='grid', page_size=ITEM_PAGE_SIZE, sale_status=None, unsold_only=False, updated_since=None, sold_to_only=False):
+    """
+    Yield the user's items in pages of at most page_size, newest first.
+    Pages are keyed on (created_at, id) instead of offsets, so every request
+    is a bounded index range scan however deep into the inventory it is.
+    With updated_since, only rows changed at or after that timestamp are read.
+    """
+    service_client = get_service_client()
+    include_sales = 'sales_overlay_url' in projection_fields(profile)
+    cursor = None
+    while True:
+        query = service_client.table('items')\
+            .select(projection_select(profile))\
+            .eq('user_id', user_id)\
+            .limit(page_size)
+        if sale_status:
+            query = query.eq('sale_status', sale_status)
+        if unsold_only:
+            query = query.not_.is_('is_sold', 'true')
+        if sold_to_only:
+            query = query.not_.is_('sold_to', 'null')
+        if updated_since:
+            query = query.gte('updated_at', updated_since)
+        
+        # Continue strictly after the last row of the previous page
+        if cursor:
+            created_at, item_id = cursor
+            query.params = query.params.add(
+                'or', f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{item_id}))'
+            )
+        query.params = query.params.add('order', 'created_at.desc,id.desc')
+        
+        page = query.execute().data
+        if not page:
+            return
+        yield attach_image_urls(page, include_sales)
+        if len(page) < page_size:
+            return
+        cursor = (page[-1]['created_at'], page[-1]['id'])
+
+# Newest updated_at among items (and default), used as the delta sync watermark
+def latest_updated_at(items, default=None):
+    timestamps = [item['updated_at'] for item in items if item.get('updated_at')]
+    if default:
+        timestamps.append(default)
+    if not timestamps:
+        return default
+    return max(timestamps, key=datetime.datetime.fromisoformat)
+
+# Count a user's items without fetching them
+def count_items(user_id):
+    service_client = get_service_client()
+    response = service_client.table('items')\
+        .select('id', count='exact')\
+        .eq('user_id', user_id)\
+        .limit(1)\
+        .execute()
+    return response.count
+
+# Fetch the ids of all of a user's items, keyset paginated on id
+def fetch_item_ids(user_id, page_size=1000):
+    service_client = get_service_client()
+    item_ids = []
+    while True:
+        query = service_client.table('items')\
+            .select('id')\
+            .eq('user_id', user_id)\
+            .order('id')\
+            .limit(page_size)
+        if item_ids:
+            query = query.gt('id', item_ids[-1])
+        page = query.execute().data
+        item_ids.extend(row['id'] for row in page)
+        if len(page) < page_size:
+            return item_ids
+
+# How far before the watermark a delta sync starts reading
+SYNC_OVERLAP = datetime.timedelta(seconds=60)
+
+# Bring a cached profile up to date with rows changed since its watermark
+def sync_items(user_id, profile, watermark):
+    """
+    Delta sync: fetch only rows whose updated_at is at or after the watermark
+    minus SYNC_OVERLAP, and merge them into the cache by id. updated_at is
+    the writing transaction's start time, so a write that commits after a
+    sync can carry an earlier timestamp than the watermark; the overlap
+    re-reads that window. Deleted rows leave nothing to fetch, so the merged
+    count is checked against the live count and, if they differ, the cache
+    is pruned against the live ids. Returns None if the cache entry
+    disappeared meanwhile.
+    """
+    updated_since = (datetime.datetime.fromisoformat(watermark) - SYNC_OVERLAP).isoformat() if watermark else None
+    changed = {}
+    for page in iter_item_pages(user_id, profile, updated_since=updated_since):
+        for item in page:
+            changed[item['id']] = item
+    changed = list(changed.values())
+    watermark = latest_updated_at(changed, watermark)
+    merged_count = merge_cached_items(user_id, profile, changed, watermark)
+    if merged_count != count_items(user_id):
+        merge_cached_items(user_id, profile, [], watermark, live_ids=fetch_item_ids(user_id))
+    return get_cached_items(user_id, profile)
+
+# Whether an item passes the stream filters
+def _matches_filters(item, sale_status=None, unsold_only=False, sold_to_only=False):
+    if sale_status and item['sale_status'] != sale_status:
+        return False
+    if sold_to_only and not item['sold_to']:
+        return False
+    return not (unsold_only and item['is_sold'])
+
+# Stream the current user's items page by page for rendering
+def stream_items(profile='grid', sale_status=None, unsold_only=False, sold_to_only=False, page_size=ITEM_PAGE_SIZE):
+    """
+    Yield pages of the current user's items that match the filters.
+    A warm per-user cache is sliced in memory, and an expired one is delta
+    synced first. With nothing cached, an inventory of up to
+    ITEM_CACHE_MAX_ROWS is fetched whole, handed on filtered page by page
+    and then cached, so the next rerun reads no rows at all. A larger one is
+    never held whole: only the matching rows are streamed from the database,
+    one bounded page at a time.
+    """
+    try:
+        user_id = get_user_id()
+        if not user_id:
+            return
+        
+        store = get_cached_store(user_id, profile)
+        if store is None and get_sync_state(user_id, profile) is not None:
+            store = load_item_store(profile)
+        
+        if store is None:
+            if count_items(user_id) > ITEM_CACHE_MAX_ROWS:
+                yield from iter_item_pages(
+                    user_id, profile, page_size, sale_status, unsold_only, sold_to_only=sold_to_only
+                )
+                return
+            items = []
+            for page in iter_item_pages(user_id, profile, page_size):
+                items.extend(page)
+                matching = [item for item in page if _matches_filters(item, sale_status, unsold_only, sold_to_only)]
+                if matching:
+                    yield matching
+            set_cached_items(user_id, items, profile, projection_fields(profile), latest_updated_at(items))
+            return
+        
+        # Apply the filters using the store's indexes, which are already ordered newest first
+        if sale_status:
+            matching = store.with_sale_status(sale_status)
+            if unsold_only:
+                matching = [item for item in matching if not item['is_sold']]
+        elif unsold_only:
+            matching = store.unsold()
+        else:
+            matching = store.newest_first
+        if sold_to_only:
+            matching = [item for item in matching if item['sold_to']]
+        for start in range(0, len(matching), page_size):
+            yield matching[start:start + page_size]
+    except Exception as e:
+        st.error(f"Error loading items: {str(e)}")
+        if is_development:
+            st.error(traceback.format_exc())
+
 # Load items from database
-@st.cache_data(ttl=60)
-def load_items(force_reload=False):
-    if force_reload:
-        st.cache_data.clear()
+def load_items(force_reload=False, profile='grid'):
     try:
         user_id = get_user_id()
         if not user_id:
             return []
         
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
-        
-        # Get items with their images and sales images in a single query
-        response = service_client.table('items')\
-            .select('*, item_images(image_url, sales_image_overlay_url, sales_image_extended_url)')\
-            .eq('user_id', user_id)\
-            .execute()
+        # Serve from the per-user cache unless a reload is forced
+        if force_reload:
+            invalidate_cached_items(user_id)
+        else:
+            cached_items = get_cached_items(user_id, profile)
+            if cached_items is not None:
+                return cached_items
             
-        # Process the response to include image URLs
+            # Once the cache has expired, fetch only what changed since the last sync
+            sync_state = get_sync_state(user_id, profile)
+            if sync_state is not None:
+                watermark, _ = sync_state
+                synced_items = sync_items(user_id, profile, watermark)
+                if synced_items is not None:
+                    return synced_items
+        
+        # Get the profile's columns and images, one keyset page at a time
         items = []
-        for item in response.data:
-            # Get the first image URL if available
-            image_url = None
-            sales_overlay_url = None
-            sales_extended_url = None
-            if 'item_images' in item and item['item_images']:
-                image_url = item['item_images'][0]['image_url']
-                sales_overlay_url = item['item_images'][0].get('sales_image_overlay_url')
-                sales_extended_url = item['item_images'][0].get('sales_image_extended_url')
-            
-            # Add all URLs to the item
-            item['image_url'] = image_url
-            item['sales_overlay_url'] = sales_overlay_url
-            item['sales_extended_url'] = sales_extended_url
-            items.append(item)
-            
+        for page in iter_item_pages(user_id, profile):
+            items.extend(page)
+        if len(items) <= ITEM_CACHE_MAX_ROWS:
+            set_cached_items(user_id, items, profile, projection_fields(profile), latest_updated_at(items))
         return items
     except Exception as e:
         st.error(f"Error loading items: {str(e)}")
         st.error(traceback.format_exc())
         return []
 
+# Load the current user's items as an indexed ItemStore
+def load_item_store(profile='grid', force_reload=False):
+    items = load_items(force_reload, profile)
+    user_id = get_user_id()
+    store = get_cached_store(user_id, profile) if user_id else None
+    return store if store is not None else ItemStore(items)
+
+# Get the home page dashboard: status counts and the most recent items in one call
+def get_item_dashboard(recent_limit=5):
+    try:
+        user_id = get_user_id()
+        if not user_id:
+            return None
+        
+        # Use the shared service role client
+        service_client = get_service_client()
+        
+        response = service_client.rpc('get_item_dashboard', {
+            'p_user_id': user_id,
+            'p_recent_limit': recent_limit
+        }).execute()
+        
+        if response.data:
+            return response.data[0]
+        return None
+    except Exception as e:
+        st.error(f"Error loading dashboard: {str(e)}")
+        if is_development:
+            st.error(traceback.format_exc())
+        return None
+
+# Thumbnail paths are never reused, so browsers and CDNs may cache them for a year
+THUMBNAIL_CACHE_CONTROL = '31536000'
+
+# Build the storage uploads for an item's image and its thumbnails
+def item_image_uploads(item_id, image_data, file_options=None):
+    """
+    Take image_data as returned by normalize_upload and return
+    (original, thumbnails, widths): the (path, data, file_options) tuple the
+    upload pipeline takes for the original, the tuples of its thumbnails,
+    and the thumbnail widths generated.
+    """
+    # Generate a unique filename; normalized uploads are always JPEG
+    filename = f"{item_id}/{uuid.uuid4()}.jpg"
+    original = (filename, image_data, {
+        'content-type': 'image/jpeg',
+        **(file_options or {})
+    })
+    
+    # Thumbnails are stored next to the original, named after it
+    content_types = {extension: content_type for extension, _, content_type in THUMBNAIL_FORMATS}
+    generated = make_thumbnails(image_data)
+    thumbnails = [
+        (thumbnail_path(filename, width, extension), thumbnail, {
+            'content-type': content_types[extension],
+            'cache-control': THUMBNAIL_CACHE_CONTROL
+        })
+        for (width, extension), thumbnail in generated.items()
+    ]
+    widths = sorted({width for width, _ in generated})
+    return original, thumbnails, widths
+
+# Work out an uploaded image's URL and thumbnails from the upload results
+def uploaded_image(original, thumbnails, widths, urls):
+    """Return (image_url, thumbnail_widths); the widths are None unless every thumbnail was stored."""
+    image_url = urls.get(original[0])
+    if widths and all(path in urls for path, _, _ in thumbnails):
+        return image_url, widths
+    return image_url, None
+
+# Upload an item's normalized image and its thumbnails to storage
+def upload_item_image(service_client, item_id, image_data, file_options=None):
+    """Return (image_url, thumbnail_widths), raising if the original could not be stored."""
+    original, thumbnails, widths = item_image_uploads(item_id, image_data, file_options)
+    urls, errors = upload_files(service_client, [original] + thumbnails)
+    if original[0] in errors:
+        raise errors[original[0]]
+    return uploaded_image(original, thumbnails, widths, urls)
+
 # Add new item
 def add_item(item_data, image=None):
     try:
@@ -137,10 +445,8 @@ def add_item(item_data, image=None):
             st.error("User not authenticated")
             return None
         
-        # Always use service role key for item operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         # Insert the item using service role
         try:
@@ -158,44 +464,41 @@ def add_item(item_data, image=None):
             return None
             
         item = response.data[0]
+        item.update({'image_url': None, 'thumbnail_widths': None, 'sales_overlay_url': None, 'sales_extended_url': None})
+        
+        # Write the new item through to the owner's cached items
+        update_cached_item(item['user_id'], item['id'], item)
         
         # If there's an image, upload it
         if image:
             try:
-                # Generate a unique filename
-                file_extension = image.name.split('.')[-1]
-                filename = f"{item['id']}/{uuid.uuid4()}.{file_extension}"
-                
-                # Upload the image to Supabase Storage
-                storage_response = service_client.storage\
-                    .from_('item-images')\
-                    .upload(filename, image.getvalue(), {
-                        'content-type': f'image/{file_extension}'
-                    })
-                
-                # Get the public URL of the uploaded image
-                image_url = service_client.storage\
-                    .from_('item-images')\
-                    .get_public_url(filename)
+                # Normalize the image, then upload it and its thumbnails to Supabase Storage
+                image_data = normalize_upload(image.getvalue())
+                image_url, thumbnail_widths = upload_item_image(service_client, item['id'], image_data)
                 
                 # Add the image reference to the item_images table
                 service_client.table('item_images')\
                     .insert({
                         'item_id': item['id'],
                         'image_url': image_url,
+                        'thumbnail_widths': thumbnail_widths,
                         'is_primary': True
                     })\
                     .execute()
+                item['image_url'] = image_url
+                item['thumbnail_widths'] = thumbnail_widths
+                update_cached_item(item['user_id'], item['id'], {'image_url': image_url, 'thumbnail_widths': thumbnail_widths})
                 
-                # Generate and store sales photos
+                # Queue the sales photos; the photo worker generates and stores them
                 try:
-                    generate_and_store_sales_photos(
-                        service_client,
-                        item['id'], 
-                        image_url, 
-                        item_data['price_usd'], 
-                        item_data['price_local'], 
-                        item_data['name']
+                    enqueue_sales_photos(
+                        item['id'],
+                        item['user_id'],
+                        image_url,
+                        item_data['price_usd'],
+                        item_data['price_local'],
+                        item_data['name'],
+                        image_data=image_data
                     )
                 except Exception as sales_error:
                     # Non-critical error, log but continue
@@ -215,17 +518,141 @@ def add_item(item_data, image=None):
             st.error(traceback.format_exc())
         return None
 
+# Add many items at once
+def add_items_bulk(items_data, images=None):
+    """
+    Insert all item rows in one request, upload their images concurrently,
+    then insert the item_images rows of the uploads that succeeded in a
+    second request. images lines up with items_data, with None for items
+    without a photo. Ids are assigned up front and images are matched to
+    items by id, so a row missing from the response never shifts them. Returns the created
+    items in input order, or None if the insert failed.
+    """
+    try:
+        # Check if user is authenticated
+        if not st.session_state.get('user'):
+            st.error("User not authenticated")
+            return None
+        
+        if not items_data:
+            return []
+        images = images or [None] * len(items_data)
+        
+        # Use the shared service role client
+        service_client = get_service_client()
+        
+        # Insert every item row in a single request
+        rows = [dict(item_data, id=str(uuid.uuid4())) for item_data in items_data]
+        try:
+            response = service_client.table('items')\
+                .insert(rows)\
+                .execute()
+                
+            if not response.data:
+                st.error("Failed to create items")
+                return None
+        except Exception as insert_error:
+            st.error(f"Error adding items: {str(insert_error)}")
+            if is_development:
+                st.error(traceback.format_exc())
+            return None
+        
+        created = {item['id']: item for item in response.data}
+        items = [created[row['id']] for row in rows if row['id'] in created]
+        images_by_id = {row['id']: image for row, image in zip(rows, images)}
+        for item in items:
+            item.update({'image_url': None, 'thumbnail_widths': None, 'sales_overlay_url': None, 'sales_extended_url': None})
+            update_cached_item(item['user_id'], item['id'], item)
+        
+        # Upload every image and thumbnail concurrently
+        uploads = {}
+        for item in items:
+            image = images_by_id.get(item['id'])
+            if not image:
+                continue
+            try:
+                uploads[item['id']] = item_image_uploads(item['id'], normalize_upload(image.getvalue()))
+            except Exception as image_error:
+                # An unreadable image leaves just this item without a photo
+                st.warning(f"Error processing image for {item['name']}: {str(image_error)}")
+        urls, errors = upload_files(
+            service_client,
+            [upload for original, thumbnails, _ in uploads.values() for upload in [original] + thumbnails],
+            t('uploading_photos')
+        )
+        
+        # Reference the uploaded images in a single item_images insert,
+        # leaving out any upload that failed
+        image_rows = []
+        for item in items:
+            if item['id'] not in uploads:
+                continue
+            original, thumbnails, widths = uploads[item['id']]
+            if original[0] in errors:
+                # Log the storage error but continue with the other items
+                if is_development:
+                    st.warning(f"Error uploading image for {item['name']}: {str(errors[original[0]])}")
+                continue
+            item['image_url'], item['thumbnail_widths'] = uploaded_image(original, thumbnails, widths, urls)
+            image_rows.append({
+                'item_id': item['id'],
+                'image_url': item['image_url'],
+                'thumbnail_widths': item['thumbnail_widths'],
+                'is_primary': True
+            })
+        
+        if image_rows:
+            try:
+                service_client.table('item_images')\
+                    .insert(image_rows)\
+                    .execute()
+            except Exception as image_error:
+                st.error(f"Error saving item images: {str(image_error)}")
+                if is_development:
+                    st.error(traceback.format_exc())
+                return items
+            
+            for image_row in image_rows:
+                update_cached_item(items[0]['user_id'], image_row['item_id'], {
+                    'image_url': image_row['image_url'],
+                    'thumbnail_widths': image_row['thumbnail_widths']
+                })
+        
+        # Queue sales photos for the items with images
+        try:
+            for item in items:
+                if item['image_url']:
+                    enqueue_sales_photos(
+                        item['id'],
+                        item['user_id'],
+                        item['image_url'],
+                        item['price_usd'],
+                        item['price_local'],
+                        item['name'],
+                        image_data=uploads[item['id']][0][1]
+                    )
+        except Exception as sales_error:
+            # Non-critical error, log but continue
+            if is_development:
+                st.warning(f"Error generating sales photos: {str(sales_error)}")
+                st.warning(traceback.format_exc())
+        
+        return items
+    except Exception as e:
+        st.error(f"Error in add_items_bulk: {str(e)}")
+        if is_development:
+            st.error(traceback.format_exc())
+        return None
+
 # Update an existing item
 def update_item(item_id, item_data, image=None):
     try:
-        # Always use service role key for item operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         # Check if item exists and belongs to user
         current_item = service_client.table('items')\
-            .select('*, item_images(*)')\
+            .select('name, price_usd, price_local, item_images(image_url, thumbnail_widths)')\
             .eq('id', item_id)\
             .execute()
         
@@ -263,36 +690,27 @@ def update_item(item_id, item_data, image=None):
         )
         
         # If there's a new image, upload it
+        new_image_data = None
         if image:
             try:
-                # Generate a unique filename
-                file_extension = image.name.split('.')[-1]
-                filename = f"{item['id']}/{uuid.uuid4()}.{file_extension}"
-                
-                # Upload the image to Supabase Storage
-                storage_response = service_client.storage\
-                    .from_('item-images')\
-                    .upload(filename, image.getvalue(), {
-                        'content-type': f'image/{file_extension}',
-                        'cache-control': 'no-cache'
-                    })
-                
-                # Get the public URL of the uploaded image
-                image_url = service_client.storage\
-                    .from_('item-images')\
-                    .get_public_url(filename)
+                # Normalize the image, then upload it and its thumbnails to Supabase Storage
+                image_data = normalize_upload(image.getvalue())
+                image_url, thumbnail_widths = upload_item_image(service_client, item['id'], image_data, {'cache-control': 'no-cache'})
                 
                 # Update or add the image reference in item_images table
                 service_client.table('item_images')\
                     .upsert({
                         'item_id': item['id'],
                         'image_url': image_url,
+                        'thumbnail_widths': thumbnail_widths,
                         'is_primary': True
                     })\
                     .execute()
                 
-                # Update the item with the image URL
+                # Update the item with the image URL; its sales photos are drawn from the bytes in hand
                 item['image_url'] = image_url
+                item['thumbnail_widths'] = thumbnail_widths
+                new_image_data = image_data
             except Exception as image_error:
                 st.error(f"Error uploading image: {str(image_error)}")
                 if is_development:
@@ -302,45 +720,35 @@ def update_item(item_id, item_data, image=None):
             # Use existing image URL if available
             if current_item.get('item_images') and len(current_item['item_images']) > 0:
                 item['image_url'] = current_item['item_images'][0]['image_url']
+                item['thumbnail_widths'] = current_item['item_images'][0].get('thumbnail_widths')
             else:
                 item['image_url'] = None
+                item['thumbnail_widths'] = None
         
-        # Generate and store sales photos if needed
+        # Write the changes through to the owner's cached items; new sales
+        # photo URLs are patched in once they have been regenerated
+        cached_fields = dict(item)
+        if should_regenerate and item['image_url']:
+            cached_fields.update({'sales_overlay_url': None, 'sales_extended_url': None})
+        update_cached_item(item['user_id'], item['id'], cached_fields)
+        
+        # Queue new sales photos if needed; the photo worker replaces the old ones
         if should_regenerate and item['image_url']:
             try:
-                # Clear any existing sales photos
-                try:
-                    # List all files for this item
-                    files = service_client.storage\
-                        .from_('item-images')\
-                        .list(str(item['id']))
-                    
-                    # Delete sales photos
-                    for file in files:
-                        if 'sales_' in file['name']:
-                            service_client.storage\
-                                .from_('item-images')\
-                                .remove([f"{item['id']}/{file['name']}"])
-                except:
-                    pass  # Ignore errors in cleanup
-                
-                # Generate new photos
-                generate_and_store_sales_photos(
-                    service_client,
+                enqueue_sales_photos(
                     item['id'],
+                    item['user_id'],
                     item['image_url'],
                     item_data['price_usd'],
                     item_data['price_local'],
-                    item_data['name']
+                    item_data['name'],
+                    image_data=new_image_data
                 )
             except Exception as photo_error:
                 st.error(f"Error handling sales photos: {str(photo_error)}")
                 if is_development:
                     st.error(traceback.format_exc())
         
-        # Clear all caches to ensure fresh data
-        st.cache_data.clear()
-        
         return item
     except Exception as e:
         st.error(f"Error updating item: {str(e)}")
@@ -351,10 +759,8 @@ def update_item(item_id, item_data, image=None):
 def generate_link_code(length=10):
     characters = string.ascii_letters + string.digits
     
-    # Use service role key for database operations
-    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    url = os.getenv("SUPABASE_URL")
-    service_client = create_client(url, service_key)
+    # Use the shared service role client
+    service_client = get_service_client()
     
     while True:
         # Generate a random code
@@ -375,10 +781,8 @@ def create_public_link(name="My Items Collection"):
     try:
         link_code = generate_link_code()
         
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         # Create the public link record
         response = service_client.table('public_links')\
@@ -401,10 +805,8 @@ def create_public_link(name="My Items Collection"):
 # Get all public links for the current user
 def get_user_public_links():
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         response = service_client.table('public_links')\
             .select('*')\
@@ -419,10 +821,8 @@ def get_user_public_links():
 # Update a public link
 def update_public_link(link_id, data):
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         response = service_client.table('public_links')\
             .update(data)\
@@ -440,10 +840,8 @@ def update_public_link(link_id, data):
 # Delete a public link
 def delete_public_link(link_id):
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         response = service_client.table('public_links')\
             .delete()\
@@ -456,66 +854,30 @@ def delete_public_link(link_id):
         st.error(f"Error deleting public link: {str(e)}")
         return False
 
-# Get a public link by its code
-def get_public_link_by_code(link_code):
+# Get everything a public link page renders in a single call
+def get_public_catalog(link_code):
+    """
+    Return the active link, its owner's name and WhatsApp settings and the
+    owner's available items (with primary image), or None for an invalid link.
+    """
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
+        
+        response = service_client.rpc('get_public_catalog', {'p_link_code': link_code}).execute()
         
-        response = service_client.table('public_links')\
-            .select('*')\
-            .eq('link_code', link_code)\
-            .eq('is_active', True)\
-            .execute()
-            
         if response.data:
             return response.data[0]
         return None
     except Exception as e:
-        st.error(f"Error fetching public link: {str(e)}")
+        st.error(f"Error fetching public catalog: {str(e)}")
         return None
 
-# Load items for a public link
-def load_public_items(user_id):
-    try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
-        
-        response = service_client.table('items')\
-            .select('*, item_images(image_url)')\
-            .eq('user_id', user_id)\
-            .eq('is_sold', False)\
-            .order('created_at', desc=True)\
-            .execute()
-            
-        # Process the response to include image URLs
-        items = []
-        for item in response.data:
-            # Get the first image URL if available
-            image_url = None
-            if 'item_images' in item and item['item_images']:
-                image_url = item['item_images'][0]['image_url']
-            
-            # Add the image URL to the item
-            item['image_url'] = image_url
-            items.append(item)
-            
-        return items
-    except Exception as e:
-        st.error(f"Error loading public items: {str(e)}")
-        return []
-
 # Update user's WhatsApp information
 def update_user_whatsapp(phone_number, share_for_items=False):
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         response = service_client.table('users')\
             .update({
@@ -530,33 +892,11 @@ def update_user_whatsapp(phone_number, share_for_items=False):
         st.error(f"Error updating WhatsApp info: {str(e)}")
         return False
 
-# Get user's WhatsApp information
-def get_user_whatsapp_info(user_id):
-    try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
-        
-        response = service_client.table('users')\
-            .select('whatsapp_phone, share_whatsapp_for_items')\
-            .eq('id', user_id)\
-            .execute()
-            
-        if response.data:
-            return response.data[0]
-        return None
-    except Exception as e:
-        st.error(f"Error getting WhatsApp info: {str(e)}")
-        return None
-
 # Update user's WhatsApp sharing preferences
 def update_whatsapp_sharing(share_for_items):
     try:
-        # Use service role key for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         response = service_client.table('users')\
             .update({
@@ -574,10 +914,8 @@ def update_whatsapp_sharing(share_for_items):
 def check_user_details(user_id):
     """Debug function to check user details using service role key to bypass RLS"""
     try:
-        # Create a new client with service role key
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        client = create_client(url, service_key)
+        # Use the shared service role client
+        client = get_service_client()
         
         # Try to get user details
         response = client.table('users').select('*').eq('id', user_id).execute()
@@ -599,10 +937,8 @@ def get_user_details_safely(user_id):
         if is_development:
             st.write(f"Debug: Attempting to get user details for ID: {user_id}")
         
-        # Try with service role first
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv("SUPABASE_URL")
-        client = create_client(url, service_key)
+        # Use the shared service role client
+        client = get_service_client()
         
         response = client.table('users').select('*').eq('id', user_id).execute()
         
@@ -0,0 +1,130 @@
+import streamlit as st
+import threading
+import time
+from collections import OrderedDict
+from services.item_store import Item, ItemStore
+
+# How long a user's cached items are trusted before they are resynced
+ITEM_CACHE_TTL = 60
+
+# Number of users whose items are kept; the least recently used are dropped
+ITEM_CACHE_MAX_USERS = 200
+
+# Process-wide item cache shared by every session
+@st.cache_resource
+def _get_item_cache():
+    """
+    Return the shared cache store.
+    Entries are keyed by user_id and then by projection profile, so one
+    seller's writes only ever touch that seller's entries. Rows are kept as
+    compact read-only Items, and each entry's ItemStore is built on first use
+    after a change. Users are kept in least recently used order.
+    """
+    return {'lock': threading.Lock(), 'entries': OrderedDict()}
+
+# Get a user's cached profiles, marking them as recently used; call with the lock held
+def _user_entries(cache, user_id):
+    entries = cache['entries'].get(user_id)
+    if entries is not None:
+        cache['entries'].move_to_end(user_id)
+    return entries or {}
+
+# Get a user's cached items for a profile, or None if missing or expired
+def get_cached_items(user_id, profile='grid'):
+    cache = _get_item_cache()
+    with cache['lock']:
+        entry = _user_entries(cache, user_id).get(profile)
+        if not entry or time.time() - entry['loaded_at'] > ITEM_CACHE_TTL:
+            return None
+        return list(entry['items'].values())
+
+# Get the indexed ItemStore for a user's cached profile, or None if missing or expired
+def get_cached_store(user_id, profile='grid'):
+    cache = _get_item_cache()
+    with cache['lock']:
+        entry = _user_entries(cache, user_id).get(profile)
+        if not entry or time.time() - entry['loaded_at'] > ITEM_CACHE_TTL:
+            return None
+        if entry['store'] is None:
+            entry['store'] = ItemStore(entry['items'].values())
+        return entry['store']
+
+# Store a freshly loaded item list for a user and profile
+def set_cached_items(user_id, items, profile='grid', fields=None, watermark=None):
+    """
+    Cache items; fields lists the keys the profile keeps when items are patched
+    and watermark is the newest updated_at among them, where delta syncs resume.
+    """
+    cache = _get_item_cache()
+    with cache['lock']:
+        cache['entries'].setdefault(user_id, {})[profile] = {
+            'loaded_at': time.time(),
+            'watermark': watermark,
+            'fields': set(fields) if fields else None,
+            'items': {item['id']: Item(item) for item in items},
+            'store': None
+        }
+        cache['entries'].move_to_end(user_id)
+        while len(cache['entries']) > ITEM_CACHE_MAX_USERS:
+            cache['entries'].popitem(last=False)
+
+# Get the delta sync state of a cached profile, expired or not
+def get_sync_state(user_id, profile='grid'):
+    """Return (watermark, item_count) for a cached profile, or None if nothing is cached."""
+    cache = _get_item_cache()
+    with cache['lock']:
+        entry = _user_entries(cache, user_id).get(profile)
+        if not entry:
+            return None
+        return entry['watermark'], len(entry['items'])
+
+# Merge rows changed since the watermark into a cached profile
+def merge_cached_items(user_id, profile, changed_items, watermark, live_ids=None):
+    """
+    Replace changed rows, advance the watermark and restart the TTL. When
+    live_ids is given, rows missing from it were deleted and are dropped.
+    Returns the number of cached items afterwards.
+    """
+    cache = _get_item_cache()
+    with cache['lock']:
+        entry = _user_entries(cache, user_id).get(profile)
+        if not entry:
+            return 0
+        for item in changed_items:
+            entry['items'][item['id']] = Item(item)
+        if live_ids is not None:
+            for item_id in set(entry['items']) - set(live_ids):
+                del entry['items'][item_id]
+        entry['store'] = None
+        entry['watermark'] = watermark
+        entry['loaded_at'] = time.time()
+        return len(entry['items'])
+
+# Write-through: insert or patch a single item in each of the user's cached profiles
+def update_cached_item(user_id, item_id, fields):
+    """
+    Merge fields into the cached copies of an item (adding it if it is new),
+    keeping only the columns each profile stores. Users without cached entries
+    are left alone; their next load reads the database anyway.
+    """
+    cache = _get_item_cache()
+    with cache['lock']:
+        for entry in _user_entries(cache, user_id).values():
+            # A partial patch for an item the entry has never seen cannot make a full row
+            if item_id not in entry['items'] and 'id' not in fields:
+                continue
+            if entry['fields'] is not None:
+                patch = {key: value for key, value in fields.items() if key in entry['fields']}
+            else:
+                patch = fields
+            
+            # Items are read-only and may be held by a rendering session, so swap in a copy
+            existing = entry['items'].get(item_id)
+            entry['items'][item_id] = existing.replace(patch) if existing else Item(patch)
+            entry['store'] = None
+
+# Drop a user's cached items so the next load goes to the database
+def invalidate_cached_items(user_id):
+    cache = _get_item_cache()
+    with cache['lock']:
+        cache['entries'].pop(user_id, None)
@@ -0,0 +1,84 @@
+from collections import defaultdict
+
+# Every field a projection profile can load onto an item
+ITEM_FIELDS = (
+    'id', 'name', 'description', 'category', 'condition',
+    'price_usd', 'price_local', 'status', 'sale_status', 'is_sold', 'sold_to',
+    'created_at', 'updated_at', 'image_url', 'thumbnail_widths', 'sales_overlay_url', 'sales_extended_url'
+)
+
+class Item:
+    """
+    Compact, read-only item row.
+    Uses __slots__ instead of a per-instance dict, and keeps the dict-style
+    item['name'] / item.get('price_usd') access the views already use.
+    """
+    __slots__ = ITEM_FIELDS
+
+    def __init__(self, fields):
+        for field in ITEM_FIELDS:
+            object.__setattr__(self, field, fields.get(field))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Item is read-only; use replace() to change fields")
+
+    def __getitem__(self, key):
+        if key not in ITEM_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        if key not in ITEM_FIELDS:
+            return default
+        return getattr(self, key)
+
+    def replace(self, fields):
+        """Return a copy with the given fields changed."""
+        merged = self.to_dict()
+        merged.update(fields)
+        return Item(merged)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in ITEM_FIELDS}
+
+class ItemStore:
+    """
+    Items for one user and profile, with indexes built once per load.
+    newest_first orders the items by created_at, and lookups by sale_status,
+    is_sold and sold_to return prebuilt lists in that order, so the grids
+    filter and page in O(k) without a query.
+    """
+    __slots__ = ('newest_first', '_by_sale_status', '_unsold', '_by_sold_to')
+
+    def __init__(self, items):
+        items = [item if isinstance(item, Item) else Item(item) for item in items]
+        self.newest_first = sorted(
+            items, key=lambda item: (item['created_at'] or '', item['id']), reverse=True
+        )
+        self._by_sale_status = defaultdict(list)
+        self._unsold = []
+        self._by_sold_to = defaultdict(list)
+        for item in self.newest_first:
+            self._by_sale_status[item['sale_status']].append(item)
+            if not item['is_sold']:
+                self._unsold.append(item)
+            if item['sold_to']:
+                self._by_sold_to[item['sold_to']].append(item)
+        self._by_sale_status = dict(self._by_sale_status)
+        self._by_sold_to = dict(self._by_sold_to)
+
+    def __len__(self):
+        return len(self.newest_first)
+
+    def __iter__(self):
+        return iter(self.newest_first)
+
+    def with_sale_status(self, sale_status):
+        return self._by_sale_status.get(sale_status, [])
+
+    def unsold(self):
+        return self._unsold
+
+    def by_sold_to(self):
+        """Items grouped by buyer, buyers in order of their newest item."""
+        return self._by_sold_to
@@ -0,0 +1,90 @@
+import streamlit as st
+import os
+import json
+import hashlib
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from utils.photo_cache import PhotoCache, PHOTO_CACHE_DIR
+
+# Maximum number of photo downloads in flight across all sessions
+FETCH_WORKERS = 8
+
+# Seconds a fetched photo is served from the local cache before it is revalidated
+REVALIDATE_AFTER = 300
+
+# Where downloaded photos are kept and how much disk they may use, apart from
+# the rendered photos so downloads never evict renders or skew their hit rate
+FETCH_CACHE_DIR = os.getenv('PHOTO_FETCH_CACHE_DIR', os.path.join(PHOTO_CACHE_DIR, 'fetched'))
+FETCH_CACHE_MAX_BYTES = int(os.getenv('PHOTO_FETCH_CACHE_MB', '128')) * 1024 * 1024
+
+# Process-wide cache of downloaded photos
+@lru_cache(maxsize=1)
+def get_fetch_cache():
+    return PhotoCache(FETCH_CACHE_DIR, FETCH_CACHE_MAX_BYTES)
+
+# Keep-alive HTTP session shared by every session
+@st.cache_resource
+def get_http_session():
+    """Return the process-wide requests session, pooling one connection per fetch worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Thread pool shared by every session
+@st.cache_resource
+def get_fetch_executor():
+    return ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="photo-fetch")
+
+def _cache_keys(url):
+    digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    return f"http-{digest}", f"http-meta-{digest}"
+
+# Fetch one photo through the local cache
+def fetch_photo(url):
+    """
+    Return the photo at url, or None if it cannot be fetched.
+    A copy fetched less than REVALIDATE_AFTER seconds ago is returned without
+    a request. An older one is revalidated with If-None-Match, so an
+    unchanged photo costs a 304 and no body.
+    """
+    cache = get_fetch_cache()
+    body_key, meta_key = _cache_keys(url)
+    cached = cache.get(body_key)
+    meta = json.loads(cache.get(meta_key) or '{}') if cached else {}
+    if cached and time.time() - meta.get('fetched_at', 0) < REVALIDATE_AFTER:
+        return cached
+
+    headers = {}
+    if cached and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    try:
+        response = get_http_session().get(url, headers=headers, timeout=30)
+    except requests.RequestException:
+        # Better a possibly stale photo than none
+        return cached
+
+    if response.status_code == 304 and cached:
+        meta['fetched_at'] = time.time()
+        cache.put(meta_key, json.dumps(meta).encode('utf-8'))
+        return cached
+    if response.status_code != 200:
+        return None
+
+    cache.put(body_key, response.content)
+    cache.put(meta_key, json.dumps({
+        'etag': response.headers.get('ETag'),
+        'fetched_at': time.time()
+    }).encode('utf-8'))
+    return response.content
+
+# Fetch many photos at once on the shared pool
+def fetch_photos(urls):
+    """Return {url: photo bytes or None} for the given URLs, fetched concurrently."""
+    urls = list(dict.fromkeys(url for url in urls if url))
+    executor = get_fetch_executor()
+    return dict(zip(urls, executor.map(fetch_photo, urls)))
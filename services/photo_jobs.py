@@ -0,0 +1,236 @@
+import streamlit as st
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+from utils.image_utils import generate_and_store_sales_photos
+from services.upload_pipeline import IMAGE_BUCKET
+
+# SQLite file holding the sales photo job queue
+PHOTO_JOB_DB = os.getenv('PHOTO_JOB_DB', os.path.join(tempfile.gettempdir(), 'declutter-photo-jobs.sqlite3'))
+
+# Seconds the worker sleeps between checks when nobody wakes it
+POLL_INTERVAL = 5
+
+# Seconds after which a running job is assumed lost (e.g. the process died) and is retried
+JOB_TIMEOUT = 300
+
+# Attempts before a job is left as failed
+MAX_ATTEMPTS = 3
+
+# Seconds before the first retry of a failed job; each further retry waits twice as long
+RETRY_DELAY = 10
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS photo_jobs (
+    item_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    image_url TEXT NOT NULL,
+    image_data BLOB,
+    name TEXT,
+    price_usd INTEGER,
+    price_local INTEGER,
+    status TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    not_before REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_photo_jobs_status ON photo_jobs (status, updated_at);
+"""
+
+# Open a connection to the job database
+def _connect():
+    connection = sqlite3.connect(PHOTO_JOB_DB, timeout=30, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+# Create the job table once per process
+@st.cache_resource
+def init_photo_jobs():
+    connection = _connect()
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        
+        # Queues created before retries were delayed lack the not_before column
+        columns = [row['name'] for row in connection.execute("PRAGMA table_info(photo_jobs)")]
+        if 'not_before' not in columns:
+            connection.execute("ALTER TABLE photo_jobs ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+    finally:
+        connection.close()
+    return PHOTO_JOB_DB
+
+# Queue sales photo generation for an item
+def enqueue_sales_photos(item_id, user_id, image_url, price_usd, price_local, item_name, image_data=None):
+    """
+    Queue (or re-queue) the item's sales photos and wake the worker.
+    There is at most one job per item: a new request replaces the queued
+    one and bumps its version, so several quick edits render only the last.
+    image_data, when given, saves the worker downloading the source.
+    """
+    init_photo_jobs()
+    connection = _connect()
+    try:
+        connection.execute(
+            """
+            INSERT INTO photo_jobs (item_id, user_id, image_url, image_data, name, price_usd, price_local, status, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (item_id) DO UPDATE SET
+                user_id = excluded.user_id,
+                image_url = excluded.image_url,
+                image_data = excluded.image_data,
+                name = excluded.name,
+                price_usd = excluded.price_usd,
+                price_local = excluded.price_local,
+                status = excluded.status,
+                version = photo_jobs.version + 1,
+                attempts = 0,
+                error = NULL,
+                not_before = 0,
+                updated_at = excluded.updated_at
+            """,
+            (str(item_id), user_id, image_url, image_data, item_name, price_usd, price_local, QUEUED, time.time())
+        )
+    finally:
+        connection.close()
+    start_photo_worker().set()
+
+# Get the job status of each of the given items
+def get_photo_job_statuses(item_ids):
+    """Return {item_id: status} for the items that have a job; others have none."""
+    item_ids = [str(item_id) for item_id in item_ids]
+    if not item_ids:
+        return {}
+    init_photo_jobs()
+    connection = _connect()
+    try:
+        placeholders = ', '.join('?' * len(item_ids))
+        rows = connection.execute(
+            f"SELECT item_id, status FROM photo_jobs WHERE item_id IN ({placeholders})",
+            item_ids
+        ).fetchall()
+    finally:
+        connection.close()
+    return {row['item_id']: row['status'] for row in rows}
+
+# Claim the oldest runnable job
+def _claim_job(connection):
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        row = connection.execute(
+            """
+            SELECT * FROM photo_jobs
+            WHERE (status = ? AND not_before <= ?) OR (status = ? AND updated_at < ?)
+            ORDER BY updated_at
+            LIMIT 1
+            """,
+            (QUEUED, time.time(), RUNNING, time.time() - JOB_TIMEOUT)
+        ).fetchone()
+        if row:
+            connection.execute(
+                "UPDATE photo_jobs SET status = ?, attempts = attempts + 1, updated_at = ? WHERE item_id = ?",
+                (RUNNING, time.time(), row['item_id'])
+            )
+        connection.execute("COMMIT")
+        return row
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+# Record how a job ended, unless it was re-queued while it ran
+def _finish_job(connection, job, error=None):
+    """A failed job is retried after an exponential backoff, so a brief outage doesn't use up its attempts."""
+    not_before = 0
+    if error is None:
+        status = DONE
+    else:
+        status = FAILED if job['attempts'] + 1 >= MAX_ATTEMPTS else QUEUED
+        not_before = time.time() + RETRY_DELAY * 2 ** job['attempts']
+    connection.execute(
+        """
+        UPDATE photo_jobs SET status = ?, error = ?, image_data = CASE WHEN ? = ? THEN NULL ELSE image_data END,
+            not_before = ?, updated_at = ?
+        WHERE item_id = ? AND version = ?
+        """,
+        (status, error, status, DONE, not_before, time.time(), job['item_id'], job['version'])
+    )
+
+# Render and store the sales photos of one job
+def _run_job(job):
+    # Imported here because data_service queues jobs from this module
+    from services.data_service import get_service_client
+    service_client = get_service_client()
+    bucket = service_client.storage.from_(IMAGE_BUCKET)
+    
+    # Note the item's current sales photos, which the new ones replace
+    old_files = [
+        f"{job['item_id']}/{file['name']}"
+        for file in bucket.list(job['item_id'])
+        if 'sales_' in file['name']
+    ]
+    
+    # Raises with the underlying cause, which the job records as its error
+    generate_and_store_sales_photos(
+        service_client,
+        job['item_id'],
+        job['image_url'],
+        job['price_usd'],
+        job['price_local'],
+        job['name'],
+        image_data=job['image_data'],
+        user_id=job['user_id']
+    )
+    
+    # Delete the old photos only once the new ones are in place
+    if old_files:
+        try:
+            bucket.remove(old_files)
+        except Exception:
+            pass  # Ignore errors in cleanup
+
+def _work(wake):
+    while True:
+        wake.wait(POLL_INTERVAL)
+        wake.clear()
+        connection = _connect()
+        try:
+            # Drain every runnable job before sleeping again
+            while True:
+                job = _claim_job(connection)
+                if job is None:
+                    break
+                try:
+                    _run_job(job)
+                    _finish_job(connection, job)
+                except Exception as e:
+                    _finish_job(connection, job, f"{str(e)}\n{traceback.format_exc()}")
+        except Exception:
+            # Keep the worker alive; the next poll retries
+            traceback.print_exc()
+        finally:
+            connection.close()
+
+# Background worker shared by every session
+@st.cache_resource
+def start_photo_worker():
+    """
+    Start the process-wide worker thread and return the event that wakes it.
+    The worker also polls, so jobs queued by other processes sharing the
+    database, or left over from a restart, are picked up too.
+    """
+    init_photo_jobs()
+    wake = threading.Event()
+    thread = threading.Thread(target=_work, args=(wake,), name="photo-jobs", daemon=True)
+    thread.start()
+    wake.set()
+    return wake
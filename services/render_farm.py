@@ -0,0 +1,64 @@
+import streamlit as st
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from utils.image_utils import render_sales_photos, SALES_PHOTO_STYLES
+
+# Number of render processes, leaving a core for the Streamlit server
+RENDER_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# Process pool shared by every session
+@st.cache_resource
+def get_render_pool():
+    """
+    Return the process-wide render pool.
+    Workers are spawned rather than forked, since forking a server that is
+    already running threads can copy held locks into the child. The photo
+    cache is on disk, so photos a worker renders are hits for every process.
+    """
+    return ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=get_context('spawn'))
+
+# Build a render job for one item
+def render_job(item_id, source, item_name, price_usd, price_local, styles=SALES_PHOTO_STYLES):
+    """source is the image URL or its bytes; a URL is downloaded by the worker."""
+    return {
+        'item_id': item_id,
+        'source': source,
+        'name': item_name,
+        'price_usd': price_usd,
+        'price_local': price_local,
+        'styles': tuple(styles)
+    }
+
+def _run_render_job(job):
+    # Runs inside a worker process. Text-only edits are rendered by the photo
+    # job worker in the server process, so a base image kept here would
+    # almost never be reused; skip the in-memory base cache
+    photos = render_sales_photos(
+        job['source'], job['price_usd'], job['price_local'], job['name'], job['styles'], use_base_cache=False
+    )
+    return job['item_id'], photos
+
+# Render a batch of jobs on the pool, yielding results as they complete
+def render_batch(jobs):
+    """
+    Yield (item_id, photos, error) for each job in completion order, where
+    photos maps style to JPEG bytes. A job that fails comes back with an
+    empty photos dict and its exception, so one bad image never stops the
+    rest of the batch.
+    """
+    if not jobs:
+        return
+    pool = get_render_pool()
+    futures = {pool.submit(_run_render_job, job): job['item_id'] for job in jobs}
+    for future in as_completed(futures):
+        try:
+            item_id, photos = future.result()
+            yield item_id, photos, None
+        except BrokenProcessPool as e:
+            # A worker died; start a fresh pool for the next batch
+            get_render_pool.clear()
+            yield futures[future], {}, e
+        except Exception as e:
+            yield futures[future], {}, e
@@ -0,0 +1,58 @@
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Storage bucket every item image and sales photo is written to
+IMAGE_BUCKET = 'item-images'
+
+# Maximum number of storage uploads in flight across all sessions
+UPLOAD_WORKERS = 8
+
+# Thread pool shared by every session
+@st.cache_resource
+def get_upload_executor():
+    """
+    Return the process-wide upload pool.
+    Storage writes are network bound, so a small bounded pool lets one item's
+    original and sales photos, or a whole bulk batch, upload at the same time
+    without one busy session opening an unbounded number of connections.
+    """
+    return ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="storage-upload")
+
+# Upload a single file to storage and return its public URL
+def upload_file(service_client, path, data, file_options):
+    # storage3 rewrites the options it is given, so each upload gets its own copy
+    bucket = service_client.storage.from_(IMAGE_BUCKET)
+    bucket.upload(path, data, dict(file_options))
+    return bucket.get_public_url(path)
+
+# Upload many files at once on the shared pool
+def upload_files(service_client, uploads, progress_text=None):
+    """
+    Upload (path, data, file_options) tuples concurrently.
+    Returns (urls, errors): public URLs and exceptions, both keyed by path.
+    With progress_text, a progress bar advances as each file finishes; it is
+    drawn from the calling script thread, never from the pool.
+    """
+    urls, errors = {}, {}
+    if not uploads:
+        return urls, errors
+
+    executor = get_upload_executor()
+    futures = {
+        executor.submit(upload_file, service_client, path, data, file_options): path
+        for path, data, file_options in uploads
+    }
+    progress = st.progress(0.0, text=progress_text) if progress_text else None
+
+    for done, future in enumerate(as_completed(futures), start=1):
+        path = futures[future]
+        try:
+            urls[path] = future.result()
+        except Exception as e:
+            errors[path] = e
+        if progress:
+            progress.progress(done / len(futures), text=f"{progress_text} ({done}/{len(futures)})")
+
+    if progress:
+        progress.empty()
+    return urls, errors
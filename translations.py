@@ -28,6 +28,11 @@ translations = {
         'local_amount': "Local Amount",
         'upload_image': "Upload Image",
         'upload_new_image': "Upload New Image (optional)",
+        'uploading_photos': "Uploading photos",
+        'uploading_sales_photos': "Uploading sales photos",
+        'sales_photo_pending': "sales photos are being generated",
+        'refresh_photos': "Refresh Photos",
+        'prepare_download': "Prepare Download",
         'save_changes': "Save Changes",
         'cancel': "Cancel",
         'edit': "Edit",
@@ -156,6 +161,11 @@ translations = {
         'local_amount': "Cantidad Local",
         'upload_image': "Subir Imagen",
         'upload_new_image': "Subir Nueva Imagen (opcional)",
+        'uploading_photos': "Subiendo fotos",
+        'uploading_sales_photos': "Subiendo fotos de venta",
+        'sales_photo_pending': "las fotos de venta se están generando",
+        'refresh_photos': "Actualizar Fotos",
+        'prepare_download': "Preparar Descarga",
         'save_changes': "Guardar Cambios",
         'cancel': "Cancelar",
         'edit': "Editar",
@@ -0,0 +1,302 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from io import BytesIO
+from multiprocessing import get_context
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageStat
+from utils.font_utils import get_font
+from utils.image_utils import (
+    load_base_image, sales_font_sizes, overlay_layer, render_sales_photos, SALES_PHOTO_STYLES
+)
+from utils.text_layout import fit_text, text_length
+
+# Phone camera resolutions used as benchmark sources (12, 24 and 48 MP)
+PHOTO_SIZES = [(4032, 3024), (6000, 4000), (8064, 6048)]
+
+# Source size of the overlay benchmark, resized to the largest base
+BASE_SIZE = (4032, 2268)
+
+def make_photo(size, quality=90):
+    """Build a synthetic JPEG phone photo with enough detail to be realistic to decode."""
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    step = max(size) // 40
+    for x in range(0, size[0], step):
+        draw.line([(x, 0), (size[0] - x, size[1])], fill=(200, 80, 40), width=3)
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=quality)
+    return buffer.getvalue()
+
+def make_alpha_photo(size):
+    """Build a synthetic PNG cut-out: the photo pattern inside an opaque ellipse on a transparent background."""
+    img = Image.open(BytesIO(make_photo(size))).convert('RGBA')
+    mask = Image.new('L', size, 0)
+    ImageDraw.Draw(mask).ellipse([(size[0] // 10, size[1] // 10), (size[0] * 9 // 10, size[1] * 9 // 10)], fill=255)
+    img.putalpha(mask)
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _peak_rss_mb():
+    # ru_maxrss survives exec, so a spawned worker would start at its parent's
+    # peak; the kernel's VmHWM is per process image and starts fresh
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _measure_decode(image_data, reduce_on_decode, repeat):
+    # Runs in a fresh process so the peak RSS belongs to this mode alone
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        load_base_image(image_data, reduce_on_decode=reduce_on_decode)
+    elapsed = (time.perf_counter() - start) / repeat
+    return elapsed * 1000, _peak_rss_mb() - baseline
+
+# Compare a full decode with reduce-on-decode for large JPEG sources
+def benchmark_decode(sizes=PHOTO_SIZES, repeat=3):
+    """Print the time per decode and the peak RSS growth of both modes."""
+    context = get_context('spawn')
+    print(f"{'source':>12} {'mode':>8} {'ms/decode':>10} {'peak MB':>8}")
+    for size in sizes:
+        image_data = make_photo(size)
+        for reduce_on_decode in (False, True):
+            with context.Pool(1) as pool:
+                ms, peak_mb = pool.apply(_measure_decode, (image_data, reduce_on_decode, repeat))
+            mode = 'draft' if reduce_on_decode else 'full'
+            print(f"{size[0]}x{size[1]:<7} {mode:>8} {ms:>10.1f} {peak_mb:>8.1f}")
+
+def _draw_overlay_per_render(base, font_sizes, item_name, price_text):
+    # Offset-shadow baseline the composited layer replaced: a band, four
+    # shadow passes and the text drawn straight onto the photo
+    title_font, price_font = (get_font(size) for size in font_sizes)
+    img = base.copy()
+    draw = ImageDraw.Draw(img)
+    title_bbox = draw.textbbox((0, 0), item_name, font=title_font)
+    price_bbox = draw.textbbox((0, 0), price_text, font=price_font)
+    title_x = (img.width - (title_bbox[2] - title_bbox[0])) // 2
+    price_x = (img.width - (price_bbox[2] - price_bbox[0])) // 2
+    title_y = int(img.height * 0.80) - (title_bbox[3] - title_bbox[1])
+    price_y = int(img.height * 0.90) - (price_bbox[3] - price_bbox[1])
+    background_height = int(img.height * 0.35)
+    background = Image.new('RGBA', (img.width, background_height), (0, 0, 0, 220))
+    img.paste(background, (0, img.height - background_height), background)
+    draw = ImageDraw.Draw(img)
+    for offset in range(1, 5):
+        draw.text((title_x + offset, title_y + offset), item_name, fill=(0, 0, 0, 160 - offset * 20), font=title_font)
+        draw.text((price_x + offset, price_y + offset), price_text, fill=(0, 0, 0, 160 - offset * 20), font=price_font)
+    draw.text((title_x, title_y), item_name, fill=(255, 255, 255), font=title_font)
+    draw.text((price_x, price_y), price_text, fill=(255, 255, 255), font=price_font)
+    return img
+
+def _draw_overlay_layered(base, font_sizes, item_name, price_text):
+    layer, top = overlay_layer(base.size, item_name, price_text, font_sizes)
+    img = base.copy()
+    img.paste(layer, (0, top), layer)
+    return img
+
+def _time_ms(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+# Compare the overlay drawn with offset shadow passes with the composited layer
+def benchmark_overlay(size=BASE_SIZE, repeat=20):
+    """
+    Print the time to draw the overlay style onto a base image, excluding
+    the JPEG encode both share. Every render gets a new item name, as a
+    rendered photo with unchanged text comes from the photo cache instead.
+    """
+    base = load_base_image(make_photo(size))
+    font_sizes = sales_font_sizes(base.width)
+    price_text = "$120 USD / 4400 Moneda Local"
+    names = (f"Mid-century armchair {number}" for number in range(2 * repeat))
+    
+    timings = [
+        ('per render', _time_ms(lambda: _draw_overlay_per_render(base, font_sizes, next(names), price_text), repeat)),
+        ('layered', _time_ms(lambda: _draw_overlay_layered(base, font_sizes, next(names), price_text), repeat))
+    ]
+    print(f"{'base':>12} {'overlay':>10} {'ms/render':>10}")
+    for mode, ms in timings:
+        print(f"{base.width}x{base.height:<7} {mode:>10} {ms:>10.1f}")
+
+# Sources of the renderer suite as (name, size, format)
+RENDER_CORPUS = [
+    ('small', (640, 480), 'JPEG'),
+    ('1080p', (1920, 1080), 'JPEG'),
+    ('12mp', (4032, 3024), 'JPEG'),
+    ('48mp', (8064, 6048), 'JPEG'),
+    ('alpha', (1600, 1600), 'PNG')
+]
+
+# Item every corpus source is rendered for, as (name, price USD, price local)
+RENDER_ITEM = ("Mid-century armchair", 120, 4400)
+
+# Golden images and the metrics baseline the suite is checked against
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'golden')
+BASELINE_FILE = os.path.join(GOLDEN_DIR, 'baseline.json')
+
+# Width golden images are stored and compared at
+GOLDEN_WIDTH = 320
+
+# Largest mean per-channel difference (0-255) from a golden image that still passes
+GOLDEN_TOLERANCE = 1.5
+
+# A metric fails the gate when it exceeds baseline * factor + slack. Times
+# depend on the machine, so only cpu_ratio, the render's CPU time relative
+# to a fixed reference workload timed in the same process, is gated; wall
+# and CPU milliseconds are reported only
+REGRESSION_FACTORS = {'cpu_ratio': 1.25, 'peak_mb': 1.25, 'bytes': 1.05}
+REGRESSION_SLACK = {'cpu_ratio': 0.1, 'peak_mb': 8, 'bytes': 0}
+
+def make_source(size, image_format):
+    return make_alpha_photo(size) if image_format == 'PNG' else make_photo(size)
+
+def _clear_render_caches():
+    # Every repeat renders as a new item would, with nothing laid out yet
+    fit_text.cache_clear()
+    text_length.cache_clear()
+
+def _reference_work():
+    # Fixed Pillow workload (resize, blur, encode) that doesn't touch the renderer
+    img = Image.linear_gradient('L').resize((1920, 1080)).convert('RGB')
+    img = img.resize((1280, 720), Image.Resampling.LANCZOS).filter(ImageFilter.GaussianBlur(3))
+    img.save(BytesIO(), format='JPEG', quality=85)
+
+def _measure_render(image_data, repeat):
+    # Runs in a fresh process so the peak RSS belongs to this source alone
+    name, price_usd, price_local = RENDER_ITEM
+    baseline = _peak_rss_mb()
+    wall = cpu = 0
+    for _ in range(repeat):
+        _clear_render_caches()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        photos = render_sales_photos(image_data, price_usd, price_local, name, use_cache=False)
+        wall += time.perf_counter() - wall_start
+        cpu += time.process_time() - cpu_start
+    peak_mb = _peak_rss_mb() - baseline
+    
+    # Time the reference workload after the renders, so it cannot raise their peak
+    reference_start = time.process_time()
+    for _ in range(repeat):
+        _reference_work()
+    reference = time.process_time() - reference_start
+    
+    metrics = {
+        'wall_ms': wall / repeat * 1000,
+        'cpu_ms': cpu / repeat * 1000,
+        'cpu_ratio': cpu / reference,
+        'peak_mb': peak_mb,
+        'bytes': sum(len(photo) for photo in photos.values())
+    }
+    return metrics, photos
+
+# Render both styles for every corpus source
+def benchmark_renderer(corpus=RENDER_CORPUS, repeat=3):
+    """
+    Print the wall and CPU time per render of both styles, the CPU time
+    relative to the reference workload, the peak RSS growth and the output
+    size for each source, and return
+    {name: (metrics, {style: JPEG bytes})}. Renders skip the photo caches.
+    """
+    context = get_context('spawn')
+    results = {}
+    print(f"{'source':>8} {'size':>10} {'wall ms':>8} {'cpu ms':>8} {'cpu/ref':>8} {'peak MB':>8} {'bytes':>8}")
+    for name, size, image_format in corpus:
+        image_data = make_source(size, image_format)
+        with context.Pool(1) as pool:
+            metrics, photos = pool.apply(_measure_render, (image_data, repeat))
+        results[name] = (metrics, photos)
+        print(f"{name:>8} {size[0]:>5}x{size[1]:<4} {metrics['wall_ms']:>8.1f} {metrics['cpu_ms']:>8.1f} "
+              f"{metrics['cpu_ratio']:>8.2f} {metrics['peak_mb']:>8.1f} {metrics['bytes']:>8}")
+    return results
+
+def _golden_path(name, style):
+    return os.path.join(GOLDEN_DIR, f"{name}_{style}.png")
+
+def _golden_image(photo):
+    img = Image.open(BytesIO(photo)).convert('RGB')
+    return img.resize((GOLDEN_WIDTH, max(1, img.height * GOLDEN_WIDTH // img.width)), Image.Resampling.BILINEAR)
+
+# Mean per-channel difference between two images of the same size
+def image_difference(first, second):
+    if first.size != second.size:
+        return 255.0
+    return sum(ImageStat.Stat(ImageChops.difference(first, second)).mean) / 3
+
+# Record the suite's output as the new golden images and baseline
+def update_golden(results):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for name, (metrics, photos) in results.items():
+        for style, photo in photos.items():
+            _golden_image(photo).save(_golden_path(name, style), format='PNG', optimize=True)
+    with open(BASELINE_FILE, 'w') as baseline_file:
+        json.dump({name: metrics for name, (metrics, _) in results.items()}, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+# Compare the suite's output with the golden images and baseline
+def check_golden(results):
+    """Return a list of failures: changed images and metrics beyond the regression gate."""
+    with open(BASELINE_FILE) as baseline_file:
+        baseline = json.load(baseline_file)
+    failures = []
+    for name, (metrics, photos) in results.items():
+        for style in SALES_PHOTO_STYLES:
+            if style not in photos:
+                failures.append(f"{name} {style}: not rendered")
+                continue
+            path = _golden_path(name, style)
+            if not os.path.exists(path):
+                failures.append(f"{name} {style}: no golden image")
+                continue
+            with Image.open(path) as golden:
+                difference = image_difference(_golden_image(photos[style]), golden.convert('RGB'))
+            if difference > GOLDEN_TOLERANCE:
+                failures.append(f"{name} {style}: differs from the golden image by {difference:.2f}")
+        for metric, factor in REGRESSION_FACTORS.items():
+            expected = baseline.get(name, {}).get(metric)
+            if expected is None:
+                continue
+            limit = expected * factor + REGRESSION_SLACK[metric]
+            if metrics[metric] > limit:
+                failures.append(f"{name} {metric}: {metrics[metric]:.2f} over the limit of {limit:.2f}")
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sales photo renderer.")
+    parser.add_argument('--check', action='store_true',
+                        help="run the renderer suite and fail on a golden image mismatch or a regression")
+    parser.add_argument('--update', action='store_true',
+                        help="run the renderer suite and record its output as the new golden images and baseline")
+    args = parser.parse_args(argv)
+    
+    if not (args.check or args.update):
+        benchmark_decode()
+        benchmark_overlay()
+        benchmark_renderer()
+        return 0
+    
+    results = benchmark_renderer()
+    if args.update:
+        update_golden(results)
+        print(f"Recorded golden images and baseline in {GOLDEN_DIR}")
+        return 0
+    failures = check_golden(results)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("Renderer matches the golden images and baseline")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+import os
+from functools import lru_cache
+from io import BytesIO
+from PIL import ImageFont
+
+# Font shipped with the app, so every server renders with the same face
+BUNDLED_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'fonts', 'Lato-Regular.ttf')
+
+# Fonts tried, in order, when the bundled font is missing
+SYSTEM_FONT_PATHS = [
+    "/System/Library/Fonts/Arial Bold.ttf",  # Try bold version first
+    "/System/Library/Fonts/Arial.ttf",  # macOS
+    "/usr/share/fonts/truetype/arial.ttf",  # Linux
+    "C:\\Windows\\Fonts\\arialbd.ttf",  # Windows Bold
+    "C:\\Windows\\Fonts\\arial.ttf"  # Windows
+]
+
+# Number of (face, size) font objects kept per process
+FONT_CACHE_SIZE = 32
+
+# Find the font face to render with
+@lru_cache(maxsize=1)
+def resolve_font_face():
+    """
+    Return the path of the first usable font, checked once per process:
+    SALES_FONT_PATH if set, then the bundled font, then the system fonts.
+    Returns None when none can be loaded.
+    """
+    candidates = [os.getenv('SALES_FONT_PATH'), BUNDLED_FONT] + SYSTEM_FONT_PATHS
+    for path in candidates:
+        if not path:
+            continue
+        try:
+            ImageFont.truetype(path, 12)
+            return path
+        except OSError:
+            continue
+    return None
+
+# Read a font file into memory once
+@lru_cache(maxsize=4)
+def _font_data(face):
+    with open(face, 'rb') as font_file:
+        return font_file.read()
+
+# Get a FreeType font object for a face and size
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def get_font(size, face=None):
+    """
+    Return a font for (face, size), defaulting to the resolved face.
+    Fonts are built from the face's bytes in memory and kept in an LRU, so
+    repeated renders at the same sizes do no font file I/O at all. Falls
+    back to Pillow's embedded scalable font when no face is available.
+    """
+    face = face or resolve_font_face()
+    if face is None:
+        return ImageFont.load_default(size)
+    return ImageFont.truetype(BytesIO(_font_data(face)), size)
@@ -1,214 +1,402 @@
 import requests
 from io import BytesIO
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageCms, ImageDraw, ImageFilter, ImageOps
 import streamlit as st
 import uuid
 import time
+from auth_state import get_user_id
+from services.item_cache import update_cached_item
+from services.upload_pipeline import upload_files
+from utils.text_layout import fit_text, draw_text_block
+from utils.photo_cache import get_photo_cache, get_base_image_cache, source_digest, sales_photo_key
 
-# Function to generate sales photos
-def generate_sales_photo(image_url, price_usd, price_local, item_name, style="overlay", item_id=None):
-    try:
-        # Check cache first if item_id is provided
-        if item_id:
-            cached_photo = get_cached_sales_photo(item_id, style)
-            if cached_photo:
-                return cached_photo
-
-        # Download the image
-        response = requests.get(image_url)
-        if response.status_code != 200:
-            return None
-            
-        # Open the image and convert to RGB if needed
-        img = Image.open(BytesIO(response.content))
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Resize large images to max 1920x1080 while maintaining aspect ratio
-        max_width = 1920
-        max_height = 1080
-        if img.width > max_width or img.height > max_height:
-            ratio = min(max_width/img.width, max_height/img.height)
-            new_size = (int(img.width * ratio), int(img.height * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-        
-        # Create a drawing context
-        draw = ImageDraw.Draw(img)
-        
-        # Calculate font sizes with larger minimum sizes and adjusted proportions
-        title_size_percent = 0.08   # 8% of image width
-        price_size_percent = 0.09   # 9% of image width
-        min_title_size = 48        # Significantly larger minimum size
-        min_price_size = 54        # Significantly larger minimum size
-        
-        # Calculate sizes and explicitly ensure we use the larger of the two values
-        proportional_title_size = int(img.width * title_size_percent)
-        proportional_price_size = int(img.width * price_size_percent)
-        
-        # Use max() to ensure we never go below minimum sizes
-        title_font_size = max(proportional_title_size, min_title_size)
-        price_font_size = max(proportional_price_size, min_price_size)
-        
-        # Try to load a font
+# Storage options for uploaded sales photos
+SALES_PHOTO_OPTIONS = {
+    'content-type': 'image/jpeg',
+    'cache-control': 'no-cache'
+}
+
+# Sales photo styles rendered for every item
+SALES_PHOTO_STYLES = ("overlay", "extended")
+
+# Download a source image, or None if it could not be fetched
+def fetch_source_image(image_url):
+    response = requests.get(image_url)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+# Longest edge and JPEG quality uploaded originals are stored at
+UPLOAD_MAX_SIZE = 2560
+UPLOAD_QUALITY = 85
+
+# Prepare an uploaded photo for storage
+def normalize_upload(image_data):
+    """
+    Return the photo as a JPEG that is upright (EXIF orientation applied),
+    has its EXIF, GPS and other metadata stripped, is capped at
+    UPLOAD_MAX_SIZE on its longest edge and is re-encoded at UPLOAD_QUALITY.
+    The ICC profile of an RGB photo is kept so colours still render
+    correctly; CMYK and greyscale photos are converted to sRGB through their
+    profile instead. Transparent areas are flattened onto white.
+    """
+    img = Image.open(BytesIO(image_data))
+    
+    # Let the JPEG decoder do the coarse downscale for oversized photos
+    scale = UPLOAD_MAX_SIZE / max(img.size)
+    if scale < 1:
+        img.draft('RGB', (int(img.width * scale), int(img.height * scale)))
+    icc_profile = img.info.get('icc_profile')
+    img = ImageOps.exif_transpose(img)
+    
+    # A profile only describes the output pixels if they were RGB to begin with
+    if icc_profile and img.mode not in ('RGB', 'RGBA', 'P'):
         try:
-            # Try different font paths
-            font_paths = [
-                "/System/Library/Fonts/Arial Bold.ttf",  # Try bold version first
-                "/System/Library/Fonts/Arial.ttf",  # macOS
-                "/usr/share/fonts/truetype/arial.ttf",  # Linux
-                "C:\\Windows\\Fonts\\arialbd.ttf",  # Windows Bold
-                "C:\\Windows\\Fonts\\arial.ttf"  # Windows
-            ]
-            title_font = None
-            price_font = None
-            
-            for path in font_paths:
-                try:
-                    title_font = ImageFont.truetype(path, title_font_size)
-                    price_font = ImageFont.truetype(path, price_font_size)
-                    break
-                except:
-                    continue
-            
-            if not title_font or not price_font:
-                raise Exception("No suitable font found")
-                
-        except:
-            # Use default font if no system font is available
-            title_font = ImageFont.load_default()
-            price_font = ImageFont.load_default()
-        
-        # Format price text
-        if price_usd and price_local:
-            price_text = f"${price_usd} USD / {price_local} Moneda Local"
-        elif price_usd:
-            price_text = f"${price_usd} USD"
-        elif price_local:
-            price_text = f"{price_local} Moneda Local"
-        else:
-            price_text = ""  # No prices available
-        
-        if style == "extended":
-            # Create a new image with extra space at the bottom
-            extension_height = int(img.height * 0.25)  # 25% of original height
-            new_img = Image.new('RGB', (img.width, img.height + extension_height), (255, 255, 255))
-            new_img.paste(img, (0, 0))
-            
-            # Create a new drawing context for the extended image
-            draw = ImageDraw.Draw(new_img)
-            
-            # Calculate text dimensions
-            title_bbox = draw.textbbox((0, 0), item_name, font=title_font)
-            price_bbox = draw.textbbox((0, 0), price_text, font=price_font)
-            
-            # Center the text in the extended space
-            title_x = (img.width - (title_bbox[2] - title_bbox[0])) // 2
-            price_x = (img.width - (price_bbox[2] - price_bbox[0])) // 2
-            
-            # Position text in the extended space with better spacing
-            title_y = img.height + (extension_height * 0.25)  # 25% into the extension
-            price_y = img.height + (extension_height * 0.65)  # 65% into the extension
-            
-            # Add the text
-            draw.text((title_x, title_y), item_name, fill=(0, 0, 0), font=title_font)
-            draw.text((price_x, price_y), price_text, fill=(0, 0, 0), font=price_font)
-            
-            # Use the new image
-            img = new_img
-            
-        else:  # overlay style
-            # Calculate text dimensions
-            title_bbox = draw.textbbox((0, 0), item_name, font=title_font)
-            price_bbox = draw.textbbox((0, 0), price_text, font=price_font)
-            
-            # Calculate positions (bottom center with padding)
-            title_x = (img.width - (title_bbox[2] - title_bbox[0])) // 2
-            price_x = (img.width - (price_bbox[2] - price_bbox[0])) // 2
-            
-            # Position text with more padding from bottom
-            title_y = int(img.height * 0.80) - (title_bbox[3] - title_bbox[1])  # Moved up further
-            price_y = int(img.height * 0.90) - (price_bbox[3] - price_bbox[1])  # Moved up further
-            
-            # Add semi-transparent background for text with better contrast
-            background_height = int(img.height * 0.35)  # Increased to 35% of image height
-            background = Image.new('RGBA', (img.width, background_height), (0, 0, 0, 220))  # Even darker background
-            img.paste(background, (0, img.height - background_height), background)
-            
-            # Create a new drawing context after pasting the background
-            draw = ImageDraw.Draw(img)
-            
-            # Add text shadow for better readability
-            shadow_offset = 4  # Increased shadow offset
-            for offset in range(1, shadow_offset + 1):  # Multiple shadow layers for better effect
-                draw.text((title_x + offset, title_y + offset), item_name, fill=(0, 0, 0, 160 - offset * 20), font=title_font)
-                draw.text((price_x + offset, price_y + offset), price_text, fill=(0, 0, 0, 160 - offset * 20), font=price_font)
-            
-            # Add the main text
-            draw.text((title_x, title_y), item_name, fill=(255, 255, 255), font=title_font)
-            draw.text((price_x, price_y), price_text, fill=(255, 255, 255), font=price_font)
+            source_profile = ImageCms.ImageCmsProfile(BytesIO(icc_profile))
+            img = ImageCms.profileToProfile(img, source_profile, ImageCms.createProfile('sRGB'), outputMode='RGB')
+        except (ImageCms.PyCMSError, OSError, ValueError):
+            pass  # Fall back to a plain conversion below
+        icc_profile = None
+    
+    # Flatten transparency onto white, since JPEG has no alpha channel
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        flattened = Image.new('RGB', img.size, (255, 255, 255))
+        flattened.paste(img, mask=img.getchannel('A'))
+        img = flattened
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    img.thumbnail((UPLOAD_MAX_SIZE, UPLOAD_MAX_SIZE), Image.Resampling.LANCZOS)
+    
+    # Only the pixels and colour profile are written; no EXIF or comments
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=UPLOAD_QUALITY, optimize=True, icc_profile=icc_profile)
+    return buffer.getvalue()
+
+# Widths of the thumbnails generated for every uploaded image
+THUMBNAIL_WIDTHS = (160, 480, 1080)
+
+# Formats each thumbnail is stored in, as (extension, Pillow format, content type);
+# WebP for browsers that support it, JPEG as the fallback
+THUMBNAIL_FORMATS = (('webp', 'WEBP', 'image/webp'), ('jpg', 'JPEG', 'image/jpeg'))
+
+# Encoder quality of the thumbnails
+THUMBNAIL_QUALITY = 80
+
+# Storage path or public URL of a thumbnail, stored next to its original
+def thumbnail_path(path, width, extension):
+    return f"{path.rsplit('.', 1)[0]}_{width}.{extension}"
+
+# Generate the thumbnails of an uploaded image
+def make_thumbnails(image_data):
+    """
+    Return {(width, extension): bytes} for every thumbnail width narrower
+    than the source, in every thumbnail format. Each width is resized from
+    the next larger one, and JPEG sources are decoded at reduced scale.
+    """
+    img = Image.open(BytesIO(image_data))
+    widths = [width for width in THUMBNAIL_WIDTHS if width < img.width]
+    if not widths:
+        return {}
+    
+    # Decode no larger than the widest thumbnail needs
+    img.draft('RGB', (widths[-1], max(1, img.height * widths[-1] // img.width)))
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    thumbnails = {}
+    for width in reversed(widths):
+        img = img.resize((width, max(1, img.height * width // img.width)), Image.Resampling.LANCZOS)
+        for extension, image_format, _ in THUMBNAIL_FORMATS:
+            buffer = BytesIO()
+            img.save(buffer, format=image_format, quality=THUMBNAIL_QUALITY)
+            thumbnails[(width, extension)] = buffer.getvalue()
+    return thumbnails
+
+# Largest size of the base image sales photos are drawn on
+BASE_MAX_SIZE = (1920, 1080)
+
+# Decode a source image into the resized RGB base every style is drawn on
+def load_base_image(image_data, reduce_on_decode=True):
+    """
+    Decode and resize a source image to fit BASE_MAX_SIZE.
+    With reduce_on_decode, JPEG sources are decoded straight to the smallest
+    1/2, 1/4 or 1/8 scale that is still at least the target size, so a
+    48 MP phone photo never has to be fully decoded just to be shrunk.
+    """
+    img = Image.open(BytesIO(image_data))
+    
+    # Resize large images to max 1920x1080 while maintaining aspect ratio
+    max_width, max_height = BASE_MAX_SIZE
+    new_size = None
+    if img.width > max_width or img.height > max_height:
+        ratio = min(max_width/img.width, max_height/img.height)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
         
-        # Save with slightly reduced quality for better performance
-        img_byte_arr = BytesIO()
-        img.save(img_byte_arr, format='JPEG', quality=85)
-        img_byte_arr = img_byte_arr.getvalue()
+        # Let the JPEG decoder do the coarse downscale (no-op for other formats)
+        if reduce_on_decode:
+            img.draft('RGB', new_size)
+    
+    # Convert to RGB if needed
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    if new_size:
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+    return img
+
+# Largest title and price font sizes for an image width
+def sales_font_sizes(image_width):
+    """Text is set at these sizes when it fits its area, and shrunk or wrapped when it does not."""
+    # Calculate font sizes with larger minimum sizes and adjusted proportions
+    title_size_percent = 0.08   # 8% of image width
+    price_size_percent = 0.09   # 9% of image width
+    min_title_size = 48        # Significantly larger minimum size
+    min_price_size = 54        # Significantly larger minimum size
+    
+    # Use max() to ensure we never go below minimum sizes
+    title_font_size = max(int(image_width * title_size_percent), min_title_size)
+    price_font_size = max(int(image_width * price_size_percent), min_price_size)
+    return title_font_size, price_font_size
+
+# Title and price areas of each style as (left, top, right, bottom) shares of
+# the region the text is laid out in: the whole image for the overlay style,
+# the added strip for the extended one
+TEXT_AREAS = {
+    "overlay": ((0.05, 0.66, 0.95, 0.79), (0.05, 0.80, 0.95, 0.95)),
+    "extended": ((0.05, 0.08, 0.95, 0.52), (0.05, 0.56, 0.95, 0.94))
+}
+
+# Lines of text the title and price may wrap onto
+TITLE_MAX_LINES = 2
+PRICE_MAX_LINES = 2
+
+# Fit the title and price into a style's text areas
+def layout_sales_text(style, region, item_name, price_text, font_sizes):
+    """
+    Return [(box, size, lines)] for the title and the price, where region is
+    (left, top, width, height) in image coordinates. Each text is shrunk and
+    wrapped until it fits its area.
+    """
+    left, top, width, height = region
+    blocks = []
+    for area, text, max_size, max_lines in zip(
+        TEXT_AREAS[style],
+        (item_name, price_text),
+        font_sizes,
+        (TITLE_MAX_LINES, PRICE_MAX_LINES)
+    ):
+        box = (
+            left + int(width * area[0]),
+            top + int(height * area[1]),
+            left + int(width * area[2]),
+            top + int(height * area[3])
+        )
+        size, lines = fit_text(text, box[2] - box[0], box[3] - box[1], max_size, max_lines)
+        blocks.append((box, size, lines))
+    return blocks
+
+# Format the price line drawn on a sales photo
+def format_price_text(price_usd, price_local):
+    if price_usd and price_local:
+        return f"${price_usd} USD / {price_local} Moneda Local"
+    elif price_usd:
+        return f"${price_usd} USD"
+    elif price_local:
+        return f"{price_local} Moneda Local"
+    return ""  # No prices available
+
+# Overlay band: share of the image height it covers and its colour
+OVERLAY_BAND_HEIGHT = 0.35
+OVERLAY_BAND_COLOR = (0, 0, 0, 220)
+
+# Overlay text shadow: offset and blur radius in pixels, and opacity
+SHADOW_OFFSET = 3
+SHADOW_BLUR = 3
+SHADOW_OPACITY = 160
+
+# Band, shadow and text of the overlay style, composited into one layer
+def overlay_layer(size, item_name, price_text, font_sizes):
+    """
+    Return (layer, top): an RGBA layer holding the band, the shadowed text
+    and nothing else, to be pasted at height top in a single blend. The
+    shadow is one blurred text mask rather than repeated offset draws.
+    """
+    width, height = size
+    band_height = int(height * OVERLAY_BAND_HEIGHT)
+    top = height - band_height
+    layer_size = (width, band_height)
+    
+    # Text mask, laid out relative to the layer
+    mask = Image.new('L', layer_size, 0)
+    draw = ImageDraw.Draw(mask)
+    for box, font_size, lines in layout_sales_text("overlay", (0, -top, width, height), item_name, price_text, font_sizes):
+        draw_text_block(draw, box, font_size, lines, fill=255)
+    
+    # Shadow: the mask shifted, blurred and faded
+    shadow_mask = Image.new('L', layer_size, 0)
+    shadow_mask.paste(mask, (SHADOW_OFFSET, SHADOW_OFFSET))
+    shadow_mask = shadow_mask.filter(ImageFilter.GaussianBlur(SHADOW_BLUR))
+    shadow_mask = shadow_mask.point(lambda value: value * SHADOW_OPACITY // 255)
+    
+    # Stack band, shadow and white text
+    layer = Image.new('RGBA', layer_size, OVERLAY_BAND_COLOR)
+    shadow = Image.new('RGBA', layer_size, (0, 0, 0, 0))
+    shadow.putalpha(shadow_mask)
+    layer = Image.alpha_composite(layer, shadow)
+    text = Image.new('RGBA', layer_size, (255, 255, 255, 0))
+    text.putalpha(mask)
+    layer = Image.alpha_composite(layer, text)
+    return layer, top
+
+# Draw one sales photo style over the shared base image
+def render_sales_photo(base, font_sizes, item_name, price_text, style="overlay"):
+    """Return the JPEG bytes of one style; base itself is left untouched."""
+    if style == "extended":
+        # Create a new image with extra space at the bottom
+        extension_height = int(base.height * 0.25)  # 25% of original height
+        img = Image.new('RGB', (base.width, base.height + extension_height), (255, 255, 255))
+        img.paste(base, (0, 0))
         
-        # Cache the result if item_id is provided
-        if item_id:
-            cache_sales_photo(item_id, img_byte_arr, style)
+        # Fit the text into the extended space
+        draw = ImageDraw.Draw(img)
+        region = (0, base.height, base.width, extension_height)
+        for box, font_size, lines in layout_sales_text("extended", region, item_name, price_text, font_sizes):
+            draw_text_block(draw, box, font_size, lines, fill=(0, 0, 0))
         
-        return img_byte_arr
-    except Exception as e:
-        st.error(f"Error generating sales photo: {str(e)}")
-        import traceback
-        st.error(traceback.format_exc())
-        return None
+    else:  # overlay style
+        # Blend the overlay layer onto a copy of the base in a single pass
+        layer, top = overlay_layer(base.size, item_name, price_text, font_sizes)
+        img = base.copy()
+        img.paste(layer, (0, top), layer)
+    
+    # Save with slightly reduced quality for better performance
+    img_byte_arr = BytesIO()
+    img.save(img_byte_arr, format='JPEG', quality=85)
+    return img_byte_arr.getvalue()
 
-# Cache generated sales photos in session state
-def get_cached_sales_photo(item_id, style="overlay"):
-    cache_key = f"sales_photo_{item_id}_{style}"
-    return st.session_state.get(cache_key)
-
-def cache_sales_photo(item_id, photo_bytes, style="overlay"):
-    cache_key = f"sales_photo_{item_id}_{style}"
-    st.session_state[cache_key] = photo_bytes
+# Render several sales photo styles from a single fetch and decode
+def render_sales_photos(source, price_usd, price_local, item_name, styles=SALES_PHOTO_STYLES, use_cache=True, use_base_cache=True):
+    """
+    Return {style: JPEG bytes} for the requested styles. source is either the
+    image URL or the image bytes already in hand (e.g. a fresh upload), so
+    the source is downloaded and decoded at most once for all styles.
+    Photos come from the content-addressed photo cache when the same source,
+    text and style were rendered before, and new text is drawn on the cached
+    base image when only the name or prices changed. Styles that cannot be
+    rendered are missing from the result. use_cache=False always renders from
+    scratch, for benchmarking. use_base_cache=False still uses the photo
+    cache but keeps no base image in memory, for processes that seldom see
+    the same source twice.
+    """
+    cache = get_photo_cache()
+    photos = {}
+    
+    # Identify the source by content; a known URL needs no download at all
+    image_data = None
+    if isinstance(source, str):
+        digest = cache.get_source_digest(source)
+        if digest is None:
+            image_data = fetch_source_image(source)
+            if not image_data:
+                return photos
+            digest = cache.remember_source(source, image_data)
+    else:
+        image_data = source
+        digest = source_digest(image_data)
+    
+    # Check the cache first
+    keys = {style: sales_photo_key(digest, item_name, price_usd, price_local, style) for style in styles}
+    for style, key in keys.items():
+        cached_photo = cache.get(key) if use_cache else None
+        if cached_photo:
+            photos[style] = cached_photo
+    missing = [style for style in styles if style not in photos]
+    if not missing:
+        return photos
+    
+    # Reuse the resized base when only the text changed; otherwise fetch and decode the source once
+    use_base_cache = use_cache and use_base_cache
+    base_cache = get_base_image_cache()
+    base = base_cache.get(digest) if use_base_cache else None
+    if base is None:
+        if image_data is None:
+            image_data = fetch_source_image(source)
+            if not image_data:
+                return photos
+        base = load_base_image(image_data)
+        if use_base_cache:
+            base_cache.put(digest, base)
+    font_sizes = sales_font_sizes(base.width)
+    price_text = format_price_text(price_usd, price_local)
+    
+    # Draw every missing style from the shared base
+    for style in missing:
+        photos[style] = render_sales_photo(base, font_sizes, item_name, price_text, style)
+        if use_cache:
+            cache.put(keys[style], photos[style])
+    return photos
 
 # Function to generate and store sales photos
-def generate_and_store_sales_photos(supabase, item_id, image_url, price_usd, price_local, item_name):
+def generate_and_store_sales_photos(supabase, item_id, image_url, price_usd, price_local, item_name, image_data=None, user_id=None):
+    """
+    Render both styles (from image_data when given, otherwise image_url)
+    and store them for the item's owner. The photo worker runs this off the
+    script thread, where st.error shows nothing, so failures raise with
+    their underlying cause for the job to record.
+    """
+    # Fresh uploads render from the bytes in hand; remember them
+    # under the URL so later renders skip the download too
+    if image_data:
+        get_photo_cache().remember_source(image_url, image_data)
+    photos = render_sales_photos(image_data or image_url, price_usd, price_local, item_name)
+    missing = [style for style in SALES_PHOTO_STYLES if style not in photos]
+    if missing:
+        raise Exception(f"Could not render the {', '.join(missing)} sales photo of {image_url}")
+    store_sales_photos(supabase, {item_id: photos}, user_id=user_id, raise_errors=True)
+
+# Upload rendered sales photos and save their URLs
+def store_sales_photos(supabase, rendered, progress_text=None, user_id=None, raise_errors=False):
+    """
+    rendered maps item ids to {style: JPEG bytes}. Every photo is uploaded on
+    the shared upload pool, then the URLs of items whose two uploads both
+    succeeded are saved. user_id, the items' owner, defaults to the signed-in
+    user. Returns the ids of the items that were stored. Errors are shown on
+    the page, or raised with raise_errors when there is no page to show them.
+    """
+    stored = set()
     try:
-        # Generate both styles of sales photos
-        overlay_photo = generate_sales_photo(image_url, price_usd, price_local, item_name, "overlay", item_id)
-        extended_photo = generate_sales_photo(image_url, price_usd, price_local, item_name, "extended", item_id)
-        
-        if overlay_photo and extended_photo:
+        uploads = []
+        filenames = {}
+        for item_id, photos in rendered.items():
+            overlay_photo = photos.get("overlay")
+            extended_photo = photos.get("extended")
+            if not (overlay_photo and extended_photo):
+                continue
+            
             # Generate unique filenames with timestamp to prevent caching
             timestamp = int(time.time())
             overlay_filename = f"{item_id}/sales_overlay_{timestamp}.jpg"
             extended_filename = f"{item_id}/sales_extended_{timestamp}.jpg"
-            
-            # Upload overlay version
-            supabase.storage\
-                .from_('item-images')\
-                .upload(overlay_filename, overlay_photo, {
-                    'content-type': 'image/jpeg',
-                    'cache-control': 'no-cache'
-                })
-            
-            # Upload extended version
-            supabase.storage\
-                .from_('item-images')\
-                .upload(extended_filename, extended_photo, {
-                    'content-type': 'image/jpeg',
-                    'cache-control': 'no-cache'
-                })
-            
-            # Get public URLs
-            overlay_url = supabase.storage\
-                .from_('item-images')\
-                .get_public_url(overlay_filename)
-            
-            extended_url = supabase.storage\
-                .from_('item-images')\
-                .get_public_url(extended_filename)
+            filenames[item_id] = (overlay_filename, extended_filename)
+            uploads.append((overlay_filename, overlay_photo, SALES_PHOTO_OPTIONS))
+            uploads.append((extended_filename, extended_photo, SALES_PHOTO_OPTIONS))
+        
+        # Upload every photo concurrently
+        urls, errors = upload_files(supabase, uploads, progress_text)
+        for path, upload_error in errors.items():
+            if raise_errors:
+                raise Exception(f"Error uploading sales photo {path}: {str(upload_error)}") from upload_error
+            st.error(f"Error uploading sales photo {path}: {str(upload_error)}")
+        
+        user_id = user_id or get_user_id()
+        for item_id, (overlay_filename, extended_filename) in filenames.items():
+            # Only record photos that actually reached storage
+            if overlay_filename not in urls or extended_filename not in urls:
+                continue
+            overlay_url = urls[overlay_filename]
+            extended_url = urls[extended_filename]
             
             # Update the item_images table with the new URLs
             supabase.table('item_images')\
@@ -219,12 +407,16 @@ def generate_and_store_sales_photos(supabase, item_id, image_url, price_usd, pri
                 .eq('item_id', item_id)\
                 .execute()
             
-            # Clear all caches
-            st.cache_data.clear()
-            
-            return True
+            # Patch the new URLs into the owner's cached items
+            update_cached_item(user_id, item_id, {
+                'sales_overlay_url': overlay_url,
+                'sales_extended_url': extended_url
+            })
+            stored.add(item_id)
     except Exception as e:
+        if raise_errors:
+            raise
         st.error(f"Error generating sales photos: {str(e)}")
         import traceback
         st.error(traceback.format_exc())
-    return False 
\ No newline at end of file
+    return stored
@@ -0,0 +1,178 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# Bump whenever the renderer's output changes, so old cache entries stop matching
+RENDERER_VERSION = 3
+
+# Where rendered photos are kept and how much disk they may use
+PHOTO_CACHE_DIR = os.getenv('SALES_PHOTO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'declutter-sales-photos'))
+PHOTO_CACHE_MAX_BYTES = int(os.getenv('SALES_PHOTO_CACHE_MB', '256')) * 1024 * 1024
+
+# Memory the decoded base images may use
+BASE_IMAGE_CACHE_MAX_BYTES = int(os.getenv('BASE_IMAGE_CACHE_MB', '96')) * 1024 * 1024
+
+# Fraction of the budget eviction shrinks the cache down to
+EVICT_TO = 0.9
+
+# Hash of a source image's bytes
+def source_digest(image_data):
+    return hashlib.sha256(image_data).hexdigest()
+
+# Cache key of one rendered sales photo
+def sales_photo_key(digest, item_name, price_usd, price_local, style):
+    """Hash everything that affects the rendered pixels: the source, the text and the style."""
+    fields = json.dumps([RENDERER_VERSION, digest, item_name, price_usd, price_local, style])
+    return hashlib.sha256(fields.encode('utf-8')).hexdigest()
+
+class PhotoCache:
+    """
+    Content-addressed store of photos on local disk (rendered sales photos,
+    or downloads in the photo fetcher's own instance).
+    Entries are files named by their key. Hits bump the file's mtime, and
+    writes evict the least recently used files once the directory grows past
+    max_bytes. The directory can be shared by several processes; each keeps
+    its own hit/miss counters.
+    """
+
+    def __init__(self, directory=PHOTO_CACHE_DIR, max_bytes=PHOTO_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(size for _, size, _ in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _entries(self):
+        # (path, size, mtime) of every cached file
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                data = cached.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def get(self, key):
+        """Return the cached photo for key, or None."""
+        data = self._read(key)
+        self._count('hits' if data is not None else 'misses')
+        return data
+
+    def put(self, key, data):
+        # Write to a temporary file first so readers never see a partial photo
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        
+        # An overwritten entry's old bytes leave the cache
+        try:
+            replaced_size = os.stat(path).st_size
+        except OSError:
+            replaced_size = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._counters['writes'] += 1
+            self._size += len(data) - replaced_size
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self):
+        # Rescan so files written by other processes are accounted for too
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        evicted = 0
+        for path, entry_size, _ in entries:
+            if size <= self.max_bytes * EVICT_TO:
+                break
+            try:
+                os.remove(path)
+                size -= entry_size
+                evicted += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._size = size
+            self._counters['evictions'] += evicted
+
+    def get_source_digest(self, image_url):
+        """Digest remembered for a source URL; uploads are never overwritten, so it stays valid."""
+        digest = self._read('url-' + hashlib.sha256(image_url.encode('utf-8')).hexdigest())
+        return digest.decode('ascii') if digest else None
+
+    def remember_source(self, image_url, image_data):
+        """Hash a downloaded source and remember the digest for its URL."""
+        digest = source_digest(image_data)
+        self.put('url-' + hashlib.sha256(image_url.encode('utf-8')).hexdigest(), digest.encode('ascii'))
+        return digest
+
+    def stats(self):
+        """Counters of this process, plus the cache's size in bytes and its budget."""
+        with self._lock:
+            return dict(self._counters, bytes=self._size, max_bytes=self.max_bytes)
+
+# Process-wide photo cache
+@lru_cache(maxsize=1)
+def get_photo_cache():
+    return PhotoCache()
+
+class BaseImageCache:
+    """
+    In-memory LRU of decoded, already resized base images, keyed by source
+    digest. A text-only edit redraws the text on the cached base, skipping
+    the download, decode and resize. Cached images are shared, so callers
+    must never draw on them directly.
+    """
+
+    def __init__(self, max_bytes=BASE_IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+        self._size = 0
+
+    def get(self, digest):
+        with self._lock:
+            img = self._images.get(digest)
+            if img is not None:
+                self._images.move_to_end(digest)
+            return img
+
+    def put(self, digest, img):
+        # Three bytes per pixel for the RGB bases load_base_image returns
+        size = img.width * img.height * len(img.getbands())
+        with self._lock:
+            if digest in self._images:
+                return
+            self._images[digest] = img
+            self._size += size
+            while self._size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= evicted.width * evicted.height * len(evicted.getbands())
+
+# Process-wide base image cache
+@lru_cache(maxsize=1)
+def get_base_image_cache():
+    return BaseImageCache()
@@ -0,0 +1,127 @@
+from functools import lru_cache
+from utils.font_utils import get_font
+
+# Smallest size text is shrunk to; text that still does not fit is truncated
+MIN_FONT_SIZE = 16
+
+# Gap between wrapped lines, as a share of the font size
+LINE_SPACING = 0.15
+
+# Number of measured strings and fitted layouts kept per process
+METRICS_CACHE_SIZE = 4096
+
+# Marker appended to truncated text
+ELLIPSIS = "…"
+
+# Measure a string at a font size
+@lru_cache(maxsize=METRICS_CACHE_SIZE)
+def text_length(text, size, face=None):
+    """Return the advance width of text; each (face, size, text) is measured by FreeType once."""
+    return get_font(size, face).getlength(text)
+
+# Width of a line of text
+def text_width(text, size, face=None):
+    """
+    Sum the cached widths of the line's words and spaces. Measuring costs
+    grow with string length, so a word is measured once per size however
+    many candidate lines it ends up in.
+    """
+    words = text.split(" ")
+    return sum(text_length(word, size, face) for word in words) + text_length(" ", size, face) * (len(words) - 1)
+
+# Height of one line of text at a font size
+@lru_cache(maxsize=256)
+def line_height(size, face=None):
+    ascent, descent = get_font(size, face).getmetrics()
+    return ascent + descent
+
+# Height of a block of lines at a font size
+def block_height(line_count, size, face=None):
+    if not line_count:
+        return 0
+    return line_count * line_height(size, face) + (line_count - 1) * int(size * LINE_SPACING)
+
+# Break text into lines that fit a width
+def wrap_text(text, size, max_width, face=None):
+    """Greedily wrap text at word boundaries; a word wider than max_width gets a line of its own."""
+    space = text_length(" ", size, face)
+    lines = []
+    line_width = 0
+    for word in text.split():
+        word_width = text_length(word, size, face)
+        if lines and line_width + space + word_width <= max_width:
+            lines[-1] = f"{lines[-1]} {word}"
+            line_width += space + word_width
+        else:
+            lines.append(word)
+            line_width = word_width
+    return lines
+
+# Cut text down to a width, marking the cut with an ellipsis
+def truncate_text(text, size, max_width, face=None):
+    if text_width(text, size, face) <= max_width:
+        return text
+    # Binary search for the longest prefix that still fits with the ellipsis
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text_length(text[:middle].rstrip(), size, face) + text_length(ELLIPSIS, size, face) <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low].rstrip() + ELLIPSIS
+
+def _fits(lines, size, max_width, max_height, max_lines, face):
+    if len(lines) > max_lines:
+        return False
+    if any(text_width(line, size, face) > max_width for line in lines):
+        return False
+    return block_height(len(lines), size, face) <= max_height
+
+# Fit text into a box
+@lru_cache(maxsize=METRICS_CACHE_SIZE)
+def fit_text(text, max_width, max_height, max_size, max_lines=2, face=None):
+    """
+    Return (size, lines) for the largest font size up to max_size at which
+    text, wrapped onto at most max_lines lines, fits max_width x max_height.
+    The size is found by binary search, and every width it needs is summed
+    from cached word widths. Text that does not fit even at MIN_FONT_SIZE is
+    set at that size with its overflow truncated.
+    """
+    text = " ".join(text.split())
+    if not text:
+        return max_size, ()
+
+    best = None
+    low, high = MIN_FONT_SIZE, max(max_size, MIN_FONT_SIZE)
+    while low <= high:
+        size = (low + high) // 2
+        lines = wrap_text(text, size, max_width, face)
+        if _fits(lines, size, max_width, max_height, max_lines, face):
+            best = (size, tuple(lines))
+            low = size + 1
+        else:
+            high = size - 1
+    if best:
+        return best
+
+    # Too long for the box at any allowed size: keep what fits and truncate the rest
+    size = MIN_FONT_SIZE
+    lines = wrap_text(text, size, max_width, face)
+    line_count = max_lines
+    while line_count > 1 and block_height(line_count, size, face) > max_height:
+        line_count -= 1
+    if len(lines) > line_count:
+        lines = lines[:line_count - 1] + [" ".join(lines[line_count - 1:])]
+    return size, tuple(truncate_text(line, size, max_width, face) for line in lines)
+
+# Draw fitted lines centred in a box
+def draw_text_block(draw, box, size, lines, fill, face=None):
+    """Draw lines from fit_text centred horizontally and vertically in box (left, top, right, bottom)."""
+    left, top, right, bottom = box
+    font = get_font(size, face)
+    step = line_height(size, face) + int(size * LINE_SPACING)
+    y = top + (bottom - top - block_height(len(lines), size, face)) // 2
+    for line in lines:
+        draw.text(((left + right) // 2, y), line, fill=fill, font=font, anchor="ma")
+        y += step
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import zipfile
+
+# Archive size kept in memory before it spills over to a temporary file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+class PhotoArchive:
+    """
+    ZIP archive written entry by entry to a spooled temporary file.
+    Entries are stored uncompressed (ZIP_STORED), since JPEGs do not
+    compress any further, and each photo is written out as soon as it is
+    added, so callers never need to hold the whole photo set in memory.
+    """
+
+    def __init__(self, spool_max_size=SPOOL_MAX_SIZE):
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        self._zip = zipfile.ZipFile(self.file, 'w', compression=zipfile.ZIP_STORED)
+        self._names = set()
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, filename, data):
+        # Two items can share a name; number the later ones instead of overwriting
+        stem, extension = os.path.splitext(filename)
+        unique = filename
+        number = 2
+        while unique in self._names:
+            unique = f"{stem}_{number}{extension}"
+            number += 1
+        self._names.add(unique)
+        self._zip.writestr(unique, data)
+
+    def close(self):
+        """
+        Finish the archive and return its bytes. Streamlit's download button
+        only takes bytes or plain file objects and copies the data into its
+        media store anyway, so the finished archive is held in memory once
+        here; building it entry by entry still avoids holding every photo too.
+        """
+        self._zip.close()
+        self.file.seek(0)
+        data = self.file.read()
+        self.file.close()
+        return data
@@ -2,8 +2,8 @@ import os
 import streamlit as st
 import traceback
 from utils.translation_utils import t
-from services.data_service import load_items, is_development
-from supabase import create_client
+from services.data_service import get_item_dashboard, is_development, get_service_client
+from components.item_components import render_item_image
 
 # Set development mode flag
 is_development = os.getenv('ENVIRONMENT', '').lower() == 'development'
@@ -17,10 +17,8 @@ def render_home_page():
         if is_development:
             st.write(f"Debug: Rendering home page for user: {user.id if user else None}")
         
-        # Create a service role client for database operations
-        service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-        url = os.getenv('SUPABASE_URL')
-        service_client = create_client(url, service_key)
+        # Use the shared service role client
+        service_client = get_service_client()
         
         # Get user's first name from the database
         try:
@@ -45,17 +43,20 @@ def render_home_page():
         
         # Load items
         try:
-            items = load_items()
+            # Status counts and recent items are aggregated by the database
+            dashboard = get_item_dashboard(recent_limit=5)
+            if dashboard is None:
+                raise Exception("Dashboard data is unavailable")
             
             if is_development:
-                st.write(f"Debug: Loaded {len(items)} items")
+                st.write(f"Debug: Loaded dashboard for {dashboard['total']} items")
             
-            # Calculate summary statistics
-            total_items = len(items)
-            available_items = len([item for item in items if item.get('status') == 'available'])
-            paid_items = len([item for item in items if item.get('status') == 'paid_ready'])
-            claimed_items = len([item for item in items if item.get('status') == 'claimed'])
-            complete_items = len([item for item in items if item.get('status') == 'complete'])
+            # Summary statistics
+            total_items = dashboard['total']
+            available_items = dashboard['available']
+            paid_items = dashboard['paid']
+            claimed_items = dashboard['claimed']
+            complete_items = dashboard['complete']
             
             # Display summary cards
             col1, col2, col3, col4, col5 = st.columns(5)
@@ -102,7 +103,7 @@ def render_home_page():
             st.subheader("Recent Activity")
             
             # Get recent items (last 5)
-            recent_items = sorted(items, key=lambda x: x.get('created_at', ''), reverse=True)[:5]
+            recent_items = dashboard['recent_items']
             
             if recent_items:
                 for item in recent_items:
@@ -110,7 +111,7 @@ def render_home_page():
                         col1, col2 = st.columns([1, 4])
                         with col1:
                             if item.get('image_url'):
-                                st.image(item['image_url'], width=100)
+                                render_item_image(item, width=100)
                             else:
                                 st.write("No image")
                         with col2:
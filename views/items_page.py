@@ -1,8 +1,11 @@
 import streamlit as st
+from itertools import chain
 from utils.translation_utils import t
+from services.data_service import stream_items
+from services.item_store import ItemStore
 from components.item_components import render_item_grid, render_edit_modal, render_sold_to_view
 
-def render_items_page(current_page, items, first_name=None):
+def render_items_page(current_page, first_name=None):
     # Set the appropriate title and filter
     show_all = False  # Initialize show_all
     filter_status = None  # Initialize filter_status
@@ -36,20 +39,19 @@ def render_items_page(current_page, items, first_name=None):
     # Edit Modal at the top (only shown when editing)
     render_edit_modal(rerun_callback=st.rerun)
     
-    # Filter items based on status
-    filtered_items = []  # Initialize filtered_items
+    # Filter items based on status; grid views stream their items page by page
     if show_all:
-        filtered_items = items  # Show all items
+        pages = stream_items()  # Show all items
     elif filter_status is None:
         if current_page == 'sold_to':
-            # Pass to the specialized sold_to view renderer
-            render_sold_to_view(items)
+            # Pass to the specialized sold_to view renderer, which groups the sold items
+            render_sold_to_view(ItemStore(chain.from_iterable(stream_items(sold_to_only=True))))
             return
         else:
-            filtered_items = [item for item in items if not item.get('is_sold')]
+            pages = stream_items(unsold_only=True)
     else:
-        filtered_items = [item for item in items if item.get('sale_status') == filter_status]
+        pages = stream_items(sale_status=filter_status)
     
     # Display filtered items if not in sold_to view
     if current_page != 'sold_to':
-        render_item_grid(filtered_items, rerun_callback=st.rerun) 
\ No newline at end of file
+        render_item_grid(chain.from_iterable(pages), rerun_callback=st.rerun) 
\ No newline at end of file
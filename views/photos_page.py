@@ -1,101 +1,144 @@
 import streamlit as st
-import requests
 from io import BytesIO
-import zipfile
 from utils.translation_utils import t
-from utils.image_utils import generate_sales_photo, generate_and_store_sales_photos
+from utils.image_utils import store_sales_photos
+from utils.zip_utils import PhotoArchive
+from utils.photo_cache import get_photo_cache
+from services.data_service import get_service_client, stream_items, is_development
+from services.render_farm import render_batch, render_job
+from services.photo_jobs import get_photo_job_statuses, QUEUED, RUNNING
+from services.photo_fetcher import fetch_photos
 
-def render_photos_page(items):
+# Stored sales photo URL of an item for a style
+def sales_photo_url(item, style):
+    if style == "overlay":
+        return item.get('sales_overlay_url')
+    elif style == "extended":
+        return item.get('sales_extended_url')
+    return None
+
+# Pair each streamed item with its photo job status and stored sales photo
+def with_stored_photos(pages, style):
+    """
+    Yield (item, job status, stored photo bytes or None). Per page, the job
+    statuses are read in one query and the stored photos fetched concurrently.
+    """
+    for page in pages:
+        statuses = get_photo_job_statuses([item['id'] for item in page])
+        photos = fetch_photos(sales_photo_url(item, style) for item in page)
+        for item in page:
+            yield item, statuses.get(str(item['id'])), photos.get(sales_photo_url(item, style))
+
+# Format price text for a photo caption
+def format_caption(item):
+    if item.get('price_usd') and item.get('price_local'):
+        price_text = f"${item['price_usd']} USD / {item['price_local']} Moneda Local"
+    elif item.get('price_usd'):
+        price_text = f"${item['price_usd']} USD"
+    elif item.get('price_local'):
+        price_text = f"{item['price_local']} Moneda Local"
+    else:
+        price_text = ""
+    return f"{item['name']} - {price_text}"
+
+# Name of an item's photo inside the download archive
+def archive_filename(item):
+    return f"sales_photo_{item['name'].lower().replace(' ', '_')}.jpg"
+
+def render_photos_page():
     st.title(t('generate_photos'))
     
     # Style selection
     style = st.radio(t('choose_photo_style'), [t('overlay'), t('extended')], horizontal=True)
     style = style.lower()
     
-    # Filter for available items only
-    available_items = [item for item in items if not item.get('is_sold')]
+    # Only build the archive on the run triggered by the prepare button
+    archive = PhotoArchive() if st.session_state.get('prepare_download') else None
+    photo_count = 0
+    
+    # Stream available items only, page by page
+    pending = {}
+    jobs = []
+    queued = 0
+    cols = None
+    for i, (item, job_status, sales_photo) in enumerate(with_stored_photos(stream_items('photos', unsold_only=True), style)):
+        # Create the grid layout once the first item arrives
+        if cols is None:
+            st.write(t('loading_photos'))
+            cols = st.columns(3)
+        if item.get('image_url') and job_status in (QUEUED, RUNNING):
+            # The photo worker is still generating this item's photos
+            with cols[i % 3]:
+                st.info(f"{item['name']}: {t('sales_photo_pending')}")
+            queued += 1
+        elif item.get('image_url'):
+            with cols[i % 3]:
+                # Use the pre-generated sales photo if there is one
+                if sales_photo:
+                    st.image(BytesIO(sales_photo), caption=format_caption(item), width=200)
+                    photo_count += 1
+                    if archive is not None:
+                        archive.add(archive_filename(item), sales_photo)
+                else:
+                    # Only generate if not available in storage; keep the
+                    # photo's place in the grid until its render finishes
+                    pending[item['id']] = (item, st.empty())
+                    jobs.append(render_job(
+                        item['id'],
+                        item['image_url'],
+                        item['name'],
+                        item.get('price_usd'),
+                        item.get('price_local')
+                    ))
+        else:
+            with cols[i % 3]:
+                st.warning(f"No image available for {item['name']}")
     
-    if available_items:
-        # Add download all button
-        all_photos = []
-        
-        st.write(t('loading_photos'))
-        
-        # Create a grid layout
-        cols = st.columns(3)
-        for i, item in enumerate(available_items):
-            if item.get('image_url'):
-                with cols[i % 3]:
-                    # Try to use pre-generated sales photo
-                    sales_photo = None
-                    if style == "overlay" and item.get('sales_overlay_url'):
-                        response = requests.get(item['sales_overlay_url'])
-                        if response.status_code == 200:
-                            sales_photo = response.content
-                    elif style == "extended" and item.get('sales_extended_url'):
-                        response = requests.get(item['sales_extended_url'])
-                        if response.status_code == 200:
-                            sales_photo = response.content
-                    
-                    # Only generate if not available in storage
-                    if not sales_photo:
-                        sales_photo = generate_sales_photo(
-                            item['image_url'],
-                            item.get('price_usd'),
-                            item.get('price_local'),
-                            item['name'],
-                            style,
-                            item['id']
-                        )
-                        # Store the generated photo for future use
-                        if sales_photo:
-                            generate_and_store_sales_photos(
-                                st.session_state.supabase,
-                                item['id'],
-                                item['image_url'],
-                                item.get('price_usd'),
-                                item.get('price_local'),
-                                item['name']
-                            )
-                    
-                    if sales_photo:
-                        # Format price text for caption
-                        if item.get('price_usd') and item.get('price_local'):
-                            price_text = f"${item['price_usd']} USD / {item['price_local']} Moneda Local"
-                        elif item.get('price_usd'):
-                            price_text = f"${item['price_usd']} USD"
-                        elif item.get('price_local'):
-                            price_text = f"{item['price_local']} Moneda Local"
-                        else:
-                            price_text = ""
-                        
-                        st.image(BytesIO(sales_photo), caption=f"{item['name']} - {price_text}", width=200)
-                        all_photos.append({
-                            'name': item['name'],
-                            'photo': sales_photo
-                        })
-            else:
-                with cols[i % 3]:
-                    st.warning(f"No image available for {item['name']}")
-        
-        # Add download all button if we have photos
-        if all_photos:            
-            # Create a ZIP file containing all photos
-            zip_buffer = BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w') as zip_file:
-                for photo in all_photos:
-                    zip_file.writestr(
-                        f"sales_photo_{photo['name'].lower().replace(' ', '_')}.jpg",
-                        photo['photo']
-                    )
-            
+    if cols is None:
+        st.info(t('no_available_items'))
+    
+    # Clicking reruns the page, which picks up the photos finished since
+    if queued:
+        st.button(t('refresh_photos'))
+    
+    # Render the missing photos on the render farm, showing each one as it completes
+    rendered = {}
+    for item_id, photos, error in render_batch(jobs):
+        item, placeholder = pending[item_id]
+        if error:
+            placeholder.error(f"Error generating sales photo: {str(error)}")
+            continue
+        if photos.get(style):
+            placeholder.image(BytesIO(photos[style]), caption=format_caption(item), width=200)
+            photo_count += 1
+            if archive is not None:
+                archive.add(archive_filename(item), photos[style])
+        rendered[item_id] = photos
+    
+    # Store the generated photos for future use
+    if rendered:
+        store_sales_photos(get_service_client(), rendered, t('uploading_sales_photos'))
+    
+    # Offer the download all button if we have photos
+    if photo_count:
+        if archive is None:
+            # Building the ZIP costs a pass over every photo, so wait until it is asked for
+            st.button(t('prepare_download'), key='prepare_download')
+        else:
             # Add download all button
             st.download_button(
                 label=t('download_all'),
-                data=zip_buffer.getvalue(),
+                data=archive.close(),
                 file_name="all_sales_photos.zip",
                 mime="application/zip",
                 key="download_all"
             )
-    else:
-        st.info(t('no_available_items')) 
\ No newline at end of file
+    
+    # Show how well the sales photo cache is doing in development
+    if is_development:
+        stats = get_photo_cache().stats()
+        st.caption(
+            f"Photo cache (this process): {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['bytes'] / 1024 / 1024:.1f} of "
+            f"{stats['max_bytes'] / 1024 / 1024:.0f} MB"
+        )
@@ -1,8 +1,7 @@
 import os
 import streamlit as st
 import traceback
-from supabase import create_client
-from services.data_service import get_user_details_safely, get_user_public_links, create_public_link, update_public_link, delete_public_link
+from services.data_service import get_service_client, get_user_details_safely, get_user_public_links, create_public_link, update_public_link, delete_public_link
 from utils.translation_utils import t
 
 # Set development mode flag
@@ -12,10 +11,8 @@ def render_public_links_page():
     st.title(t('public_links'))
     st.markdown(t('public_links_desc'))
     
-    # Create service role client for database operations
-    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    url = os.getenv('SUPABASE_URL')
-    service_client = create_client(url, service_key)
+    # Use the shared service role client
+    service_client = get_service_client()
     
     # Get existing public links with error handling
     try:
@@ -1,12 +1,12 @@
 import streamlit as st
-from services.data_service import get_public_link_by_code, load_public_items, get_user_whatsapp_info
+from services.data_service import get_public_catalog
+from components.item_components import render_item_image
 from utils.translation_utils import t
 from utils.whatsapp_utils import generate_whatsapp_message_template, create_whatsapp_link
 import base64
 from PIL import Image
 import io
 import os
-from supabase import create_client
 
 def render_public_page(link_code):
     # Custom function to display bilingual text
@@ -28,37 +28,29 @@ def render_public_page(link_code):
         # Return both languages
         return f"{english} / {spanish}"
     
-    # Get the public link info
-    public_link = get_public_link_by_code(link_code)
+    # Get the link, owner and available items in one round trip
+    catalog = get_public_catalog(link_code)
     
-    if not public_link:
+    if not catalog:
         st.error(bilingual('invalid_link'))
         return
     
-    # Load the available items for this link's owner
-    items = load_public_items(public_link['user_id'])
+    public_link = catalog['link']
+    items = catalog['items'] or []
     
-    # Create a service role client for database operations
-    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-    url = os.getenv('SUPABASE_URL')
-    service_client = create_client(url, service_key)
-    
-    # Get owner info including name
-    owner_info = service_client.table('users')\
-        .select('first_name, last_name')\
-        .eq('id', public_link['user_id'])\
-        .execute()
-    
-    # Get owner's first and last name
-    if owner_info.data:
-        owner_first_name = owner_info.data[0].get('first_name', '')
-        owner_last_name = owner_info.data[0].get('last_name', '')
+    # Get owner's first and last name (null when the owner has no users row)
+    if catalog.get('owner_first_name') is not None:
+        owner_first_name = catalog.get('owner_first_name', '')
+        owner_last_name = catalog.get('owner_last_name') or ''
         owner_full_name = f"{owner_first_name} {owner_last_name}"
     else:
         owner_full_name = 'User'
     
     # Get owner's WhatsApp info
-    owner_whatsapp = get_user_whatsapp_info(public_link['user_id'])
+    owner_whatsapp = {
+        'whatsapp_phone': catalog.get('whatsapp_phone'),
+        'share_whatsapp_for_items': catalog.get('share_whatsapp_for_items')
+    }
     
     # Display owner's name as main header
     st.title(owner_full_name)
@@ -97,7 +89,7 @@ def render_public_page(link_code):
                 
                 # Display the image
                 if item.get('image_url'):
-                    st.image(item['image_url'], use_container_width=True)
+                    render_item_image(item, sizes="(max-width: 640px) 100vw, 33vw")
                 else:
                     st.markdown("*No image available / Imagen no disponible*")
                 
@@ -2,8 +2,7 @@ import os
 import streamlit as st
 import traceback
 import time
-from supabase import create_client
-from services.data_service import update_user_whatsapp, get_user_details_safely
+from services.data_service import update_user_whatsapp, get_user_details_safely, get_service_client
 from utils.translation_utils import t
 
 def render_settings_page():
@@ -47,9 +46,8 @@ def render_settings_page():
                     # Create user record with service role client
                     from services.data_service import check_user_details
                     
-                    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-                    url = os.getenv("SUPABASE_URL")
-                    client = create_client(url, service_key)
+                    # Use the shared service role client
+                    client = get_service_client()
                     
                     response = client.table('users').insert({
                         'id': user.id,
@@ -114,10 +112,8 @@ def render_settings_page():
         if submit_personal:
             if first_name.strip() and last_name.strip():
                 try:
-                    # Use service role to update
-                    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-                    url = os.getenv("SUPABASE_URL")
-                    client = create_client(url, service_key)
+                    # Use the shared service role client
+                    client = get_service_client()
                     
                     # Update user information
                     client.table('users')\
@@ -187,10 +183,8 @@ def render_settings_page():
                 formatted_phone = phone_number.strip().replace("-", "").replace(" ", "")
                 
                 try:
-                    # Use service role to update
-                    service_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-                    url = os.getenv("SUPABASE_URL")
-                    client = create_client(url, service_key)
+                    # Use the shared service role client
+                    client = get_service_client()
                     
                     # Update WhatsApp information directly
                     client.table('users')\